@@ -1,4 +1,5 @@
 import sys
+from startup_report import startup_report  # First, so the import phase is timed too
 import json
 import requests
 import subprocess
@@ -9,8 +10,13 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QDesktopServices, QAction, QPixmap
 from PyQt6.QtCore import Qt, QUrl, QSize
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtWebEngineCore import QWebEngineSettings
+
+from http_session import REQUEST_TIMEOUT, get_session
+from image_cache import ImageCache, get_image_cache
+from image_loader import fetch_image_bytes
+from tmdb_client import DETAILS_PARAMS, normalize_details
+from stall_watchdog import get_stall_watchdog
+from web_engine import create_web_view, prepare_application
 
 class MovieItemWidget(QWidget):
     def __init__(self, movie, parent=None):
@@ -63,18 +69,20 @@ class MovieItemWidget(QWidget):
 
         self.setLayout(layout)
 
-    def get_movie_poster(self, poster_path):
-        if poster_path:
-            base_url = "https://image.tmdb.org/t/p/w500"
-            url = base_url + poster_path
-            try:
-                response = requests.get(url)
-                response.raise_for_status()
-                pixmap = QPixmap()
-                pixmap.loadFromData(response.content)
+    def get_movie_poster(self, path, size='w500'):
+        if path:
+            image_cache = get_image_cache()
+            cache_key = ImageCache.make_key(path, size)
+            pixmap = image_cache.get_pixmap(cache_key)
+            if pixmap is not None:
                 return pixmap
-            except requests.RequestException:
+            data = fetch_image_bytes(path, size, image_cache)
+            if data is None:
                 return None
+            pixmap = QPixmap()
+            pixmap.loadFromData(data)
+            image_cache.put_pixmap(cache_key, pixmap)
+            return pixmap
         else:
             return None
 
@@ -131,8 +139,10 @@ class TMDBApp(QMainWindow):
         self.bearer_token = ""  # Bearer token for authentication
 
         self.load_config()
+        startup_report.mark("config")
 
         self.init_ui()
+        startup_report.mark("window build")
 
     def load_config(self):
         try:
@@ -200,15 +210,16 @@ class TMDBApp(QMainWindow):
 
     def init_player_tab(self):
         layout = QVBoxLayout()
-        self.web_view = QWebEngineView()
-        # Attempt to adjust settings to fix CORS issues (may not work)
-        settings = self.web_view.settings()
-        settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessFileUrls, True)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.AllowRunningInsecureContent, True)
-        layout.addWidget(self.web_view)
+        # The web view is only created when something is first played, see get_web_view
+        self.web_view = None
         self.player_tab.setLayout(layout)
 
+    def get_web_view(self):
+        if self.web_view is None:
+            self.web_view = create_web_view(allow_insecure_content=True)
+            self.player_tab.layout().addWidget(self.web_view)
+        return self.web_view
+
     def tmdb_api_request(self, endpoint, params=None, method='GET'):
         base_url = "https://api.themoviedb.org/3/"
         headers = {
@@ -220,9 +231,9 @@ class TMDBApp(QMainWindow):
 
         try:
             if method == 'GET':
-                response = requests.get(url, headers=headers, params=params)
+                response = get_session().get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
             elif method == 'POST':
-                response = requests.post(url, headers=headers, json=params)
+                response = get_session().post(url, headers=headers, json=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -282,18 +293,8 @@ class TMDBApp(QMainWindow):
             QMessageBox.critical(self, "Error", "Failed to search movies.")
 
     def get_movie_details(self, movie_id):
-        # Get movie details
-        movie = self.tmdb_api_request(f"movie/{movie_id}", params={"language": "en-US"})
-        if movie:
-            # Get credits to obtain cast information
-            credits = self.tmdb_api_request(f"movie/{movie_id}/credits")
-            if credits:
-                movie['cast'] = credits.get('cast', [])
-            else:
-                movie['cast'] = []
-            return movie
-        else:
-            return None
+        movie = self.tmdb_api_request(f"movie/{movie_id}", params=DETAILS_PARAMS)
+        return normalize_details(movie) if movie else None
 
     def handle_item_action(self, item, action):
         movie = item.data(Qt.ItemDataRole.UserRole)
@@ -306,7 +307,7 @@ class TMDBApp(QMainWindow):
 
     def play_movie_embedded(self, movie_id):
         embed_url = f"https://vidbinge.dev/embed/movie/{movie_id}"
-        self.web_view.setUrl(QUrl(embed_url))
+        self.get_web_view().setUrl(QUrl(embed_url))
         self.tabs.setCurrentWidget(self.player_tab)
 
     def play_movie_in_browser(self, movie_id):
@@ -326,7 +327,7 @@ class TMDBApp(QMainWindow):
         import re
         embed_url = f"https://vidbinge.dev/embed/movie/{movie_id}"
         try:
-            response = requests.get(embed_url)
+            response = get_session().get(embed_url, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             # Simplified regex to find .m3u8 URLs in the page content
             hls_urls = re.findall(r'(https?://[^\s\'"]+\.m3u8)', response.text)
@@ -343,7 +344,12 @@ class TMDBApp(QMainWindow):
         self.load_favorites()
 
 if __name__ == "__main__":
+    startup_report.mark("imports")
+    prepare_application()
     app = QApplication(sys.argv)
+    startup_report.mark("qt init")
     window = TMDBApp()
     window.show()
+    startup_report.watch_first_paint(window)
+    get_stall_watchdog().start()
     sys.exit(app.exec())
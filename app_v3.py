@@ -1,35 +1,42 @@
 import sys
+from startup_report import startup_report  # First, so the import phase is timed too
 import json
 import requests
 import subprocess
-import os
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton,
     QLineEdit, QListWidget, QListWidgetItem, QTabWidget, QMessageBox, QMenu,
     QHBoxLayout, QStyle, QGridLayout, QTextEdit, QSizePolicy, QScrollArea
 )
-from PyQt6.QtGui import QDesktopServices, QPixmap, QIcon, QAction
+from PyQt6.QtGui import QDesktopServices, QIcon, QAction
 from PyQt6.QtCore import Qt, QUrl, QSize
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtWebEngineCore import QWebEngineSettings
+
+from detail_hydrator import DetailHydrator
+from diagnostics_panel import DiagnosticsPanel
+from image_loader import get_image_loader
+from image_sizes import get_image_sizes
+from metrics import metrics
+from request_scheduler import PRIORITY_BACKGROUND, get_request_scheduler
+from response_cache import ResponseCache
+from stall_watchdog import get_stall_watchdog
+from tmdb_client import TMDBClient
+from watch_later_store import WatchLaterStore
+from web_engine import create_web_view, prepare_application
 
 class MovieItemWidget(QWidget):
     def __init__(self, movie, parent=None, add_watch_later_callback=None):
         super().__init__(parent)
         self.movie = movie
         self.add_watch_later_callback = add_watch_later_callback
-        self.init_ui()
+        with metrics.timed('widget_build_seconds', widget=type(self).__name__):
+            self.init_ui()
 
     def init_ui(self):
         main_layout = QVBoxLayout()
         content_layout = QHBoxLayout()
         # Poster Image
         self.poster_label = QLabel()
-        pixmap = self.get_image(self.movie.get('poster_path'))
-        if pixmap:
-            self.poster_label.setPixmap(pixmap.scaled(150, 225, Qt.AspectRatioMode.KeepAspectRatio))
-        else:
-            self.poster_label.setText("No Image")
+        self.load_image(self.poster_label, self.movie.get('poster_path'), 'poster', 150, 225)
         content_layout.addWidget(self.poster_label)
 
         # Movie Information
@@ -89,20 +96,22 @@ class MovieItemWidget(QWidget):
         main_layout.addLayout(content_layout)
         self.setLayout(main_layout)
 
-    def get_image(self, path, size='w500'):
-        if path:
-            base_url = f"https://image.tmdb.org/t/p/{size}"
-            url = base_url + path
-            try:
-                response = requests.get(url)
-                response.raise_for_status()
-                pixmap = QPixmap()
-                pixmap.loadFromData(response.content)
-                return pixmap
-            except requests.RequestException:
-                return None
-        else:
-            return None
+    def load_image(self, label, path, kind, width, height):
+        if not path:
+            label.setText("No Image")
+            return
+
+        def show_pixmap(pixmap):
+            if pixmap:
+                label.setPixmap(pixmap)
+            else:
+                label.setText("No Image")
+
+        # Downloaded, decoded and scaled to width x height off the GUI thread, cache hits show right away
+        label.setText("Loading...")
+        # Smallest TMDB variant that covers the box on this screen
+        size = get_image_sizes().pick(kind, (width, height))
+        get_image_loader().load_progressive(path, size, show_pixmap, owner=self, box=(width, height))
 
     def create_cast_widget(self):
         cast_layout = QVBoxLayout()
@@ -117,11 +126,7 @@ class MovieItemWidget(QWidget):
         for index, member in enumerate(cast_members):
             actor_layout = QVBoxLayout()
             actor_image_label = QLabel()
-            profile_pixmap = self.get_image(member.get('profile_path'), size='w185')
-            if profile_pixmap:
-                actor_image_label.setPixmap(profile_pixmap.scaled(80, 120, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
-            else:
-                actor_image_label.setText("No Image")
+            self.load_image(actor_image_label, member.get('profile_path'), 'profile', 80, 120)
             actor_name_label = QLabel(member.get('name', 'Unknown'))
             actor_name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
             actor_layout.addWidget(actor_image_label)
@@ -170,7 +175,7 @@ class TrailerDialog(QMessageBox):
         self.setWindowTitle("Trailer")
         self.setStandardButtons(QMessageBox.StandardButton.Close)
         self.layout = QVBoxLayout()
-        self.web_view = QWebEngineView()
+        self.web_view = create_web_view()
         self.web_view.setUrl(QUrl(trailer_url))
         self.layout.addWidget(self.web_view)
         self.setLayout(self.layout)
@@ -206,12 +211,23 @@ class TMDBApp(QMainWindow):
         self.setGeometry(100, 100, 1000, 800)
 
         self.bearer_token = ""  # Bearer token for authentication
-        self.watch_later_list = []
 
         self.load_config()
+        self.tmdb_client = TMDBClient(self.bearer_token, cache=ResponseCache())
+        # Image size variants TMDB offers, fetched in the background
+        get_request_scheduler().submit(get_image_sizes().load, self.tmdb_client, priority=PRIORITY_BACKGROUND)
+        self.watch_later = WatchLaterStore()
+        self.watch_later.migrate_json('watch_later.json')
+        startup_report.mark("config")
+        self.detail_hydrator = DetailHydrator(self.tmdb_client)
+        self.detail_hydrator.item_loaded.connect(self.on_watch_later_detail_loaded)
+        self.detail_hydrator.batch_finished.connect(self.on_watch_later_batch_finished)
+        # batch id -> (media type, list items waiting for their details)
+        self.watch_later_batches = {}
 
         self.init_ui()
         self.apply_stylesheet()
+        startup_report.mark("window build")
 
     def load_config(self):
         try:
@@ -221,16 +237,6 @@ class TMDBApp(QMainWindow):
         except FileNotFoundError:
             self.save_config()
 
-        # Load Watch Later list
-        if os.path.exists('watch_later.json'):
-            try:
-                with open('watch_later.json', 'r') as f:
-                    self.watch_later_list = json.load(f)
-            except json.JSONDecodeError:
-                self.watch_later_list = []
-        else:
-            self.watch_later_list = []
-
     def save_config(self):
         config = {
             'bearer_token': self.bearer_token
@@ -238,10 +244,6 @@ class TMDBApp(QMainWindow):
         with open('config.json', 'w') as f:
             json.dump(config, f)
 
-        # Save Watch Later list
-        with open('watch_later.json', 'w') as f:
-            json.dump(self.watch_later_list, f)
-
     def init_ui(self):
         self.create_menu_bar()
 
@@ -258,6 +260,7 @@ class TMDBApp(QMainWindow):
         self.top_rated_tab = QWidget()
         self.tv_shows_tab = QWidget()
         self.watch_later_tab = QWidget()
+        self.diagnostics_tab = DiagnosticsPanel()
 
         self.init_favorites_tab()
         self.init_search_tab()
@@ -280,10 +283,13 @@ class TMDBApp(QMainWindow):
 
         settings_action = QAction("Settings", self)
         settings_action.triggered.connect(self.open_settings_tab)
+        diagnostics_action = QAction("Diagnostics", self)
+        diagnostics_action.triggered.connect(self.open_diagnostics_tab)
         exit_action = QAction("Exit", self)
         exit_action.triggered.connect(self.close)
 
         home_menu.addAction(settings_action)
+        home_menu.addAction(diagnostics_action)
         home_menu.addAction(exit_action)
 
         # My Videos Menu
@@ -347,15 +353,16 @@ class TMDBApp(QMainWindow):
 
     def init_player_tab(self):
         layout = QVBoxLayout()
-        self.web_view = QWebEngineView()
-        # Adjust settings to attempt to fix CORS issues (may not be effective)
-        settings = self.web_view.settings()
-        settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessFileUrls, True)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.AllowRunningInsecureContent, True)
-        layout.addWidget(self.web_view)
+        # The web view is only created when something is first played, see get_web_view
+        self.web_view = None
         self.player_tab.setLayout(layout)
 
+    def get_web_view(self):
+        if self.web_view is None:
+            self.web_view = create_web_view(allow_insecure_content=True)
+            self.player_tab.layout().addWidget(self.web_view)
+        return self.web_view
+
     def init_now_playing_tab(self):
         layout = QVBoxLayout()
         self.now_playing_list = CustomListWidget(item_clicked_callback=self.handle_item_action)
@@ -391,6 +398,11 @@ class TMDBApp(QMainWindow):
             self.tabs.addTab(self.settings_tab, "Settings")
         self.tabs.setCurrentWidget(self.settings_tab)
 
+    def open_diagnostics_tab(self):
+        if self.tabs.indexOf(self.diagnostics_tab) == -1:
+            self.tabs.addTab(self.diagnostics_tab, "Diagnostics")
+        self.tabs.setCurrentWidget(self.diagnostics_tab)
+
     def open_favorites_tab(self):
         if self.tabs.indexOf(self.favorites_tab) == -1:
             self.tabs.addTab(self.favorites_tab, "Favorites")
@@ -422,21 +434,8 @@ class TMDBApp(QMainWindow):
         self.tabs.setCurrentWidget(self.watch_later_tab)
 
     def tmdb_api_request(self, endpoint, params=None, method='GET'):
-        base_url = "https://api.themoviedb.org/3/"
-        headers = {
-            "accept": "application/json",
-            "Authorization": f"Bearer {self.bearer_token}"
-        }
-
-        url = f"{base_url}{endpoint}"
-
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, params=params)
-            elif method == 'POST':
-                response = requests.post(url, headers=headers, json=params)
-            response.raise_for_status()
-            return response.json()
+            return self.tmdb_client.request(endpoint, params, method)
         except requests.exceptions.RequestException as e:
             QMessageBox.critical(self, "Error", f"TMDB API request failed: {e}")
             return None
@@ -521,16 +520,55 @@ class TMDBApp(QMainWindow):
             QMessageBox.critical(self, "Error", "Failed to load TV Shows.")
 
     def load_watch_later(self):
+        # Rows come from the stored snapshots, titles that never got one are fetched off the
+        # GUI thread and filled in as they arrive
+        for batch_id in self.watch_later_batches:
+            self.detail_hydrator.cancel(batch_id)
+        self.watch_later_batches = {}
         self.watch_later_list_widget.clear()
-        for movie_id in self.watch_later_list:
-            movie = self.get_movie_details(movie_id)
-            if movie:
-                item = QListWidgetItem()
+        missing = {'movie': [], 'tv': []}
+        for media_type, tmdb_id, snapshot, stale in self.watch_later.entries():
+            if snapshot is None:
+                item = QListWidgetItem("Loading...")
                 item.setSizeHint(QSize(300, 250))
-                item.setData(Qt.ItemDataRole.UserRole, movie)
-                widget = MovieItemWidget(movie, add_watch_later_callback=self.add_to_watch_later)
                 self.watch_later_list_widget.addItem(item)
-                self.watch_later_list_widget.setItemWidget(item, widget)
+                missing[media_type].append((tmdb_id, item))
+            else:
+                self.add_watch_later_row(media_type, snapshot)
+        for media_type, rows in missing.items():
+            if rows:
+                batch_id = self.detail_hydrator.hydrate(media_type, [tmdb_id for tmdb_id, _ in rows])
+                self.watch_later_batches[batch_id] = (media_type, [item for _, item in rows])
+
+    def on_watch_later_detail_loaded(self, batch_id, position, details):
+        target = self.watch_later_batches.get(batch_id)
+        if target is None:
+            return  # List was reloaded while the details were in flight
+        media_type, items = target
+        self.watch_later.update_snapshot(media_type, details)
+        self.add_watch_later_row(media_type, details, items[position])
+
+    def on_watch_later_batch_finished(self, batch_id, failed, error):
+        target = self.watch_later_batches.pop(batch_id, None)
+        if target is None or not failed:
+            return
+        # Titles that could not be loaded are dropped from the list, they stay stored
+        for item in target[1]:
+            if self.watch_later_list_widget.itemWidget(item) is None:
+                self.watch_later_list_widget.takeItem(self.watch_later_list_widget.row(item))
+        QMessageBox.critical(self, "Error", f"Failed to load details for {failed} titles:\n{error}")
+
+    def add_watch_later_row(self, media_type, details, item=None):
+        # Fills in a row added earlier when given one, appends a new row otherwise
+        if item is None:
+            item = QListWidgetItem()
+            item.setSizeHint(QSize(300, 250))
+            self.watch_later_list_widget.addItem(item)
+        item.setText("")
+        item.setData(Qt.ItemDataRole.UserRole, details)
+        widget_class = TVShowItemWidget if media_type == 'tv' else MovieItemWidget
+        widget = widget_class(details, add_watch_later_callback=self.add_to_watch_later)
+        self.watch_later_list_widget.setItemWidget(item, widget)
 
     def search_movies(self):
         query = self.search_input.text()
@@ -554,63 +592,17 @@ class TMDBApp(QMainWindow):
             QMessageBox.critical(self, "Error", "Failed to search movies.")
 
     def get_movie_details(self, movie_id):
-        # Get movie details
-        movie = self.tmdb_api_request(f"movie/{movie_id}", params={"language": "en-US"})
-        if movie:
-            # Get credits to obtain cast information
-            credits = self.tmdb_api_request(f"movie/{movie_id}/credits")
-            if credits:
-                movie['cast'] = credits.get('cast', [])
-            else:
-                movie['cast'] = []
-            # Get IMDb ID
-            external_ids = self.tmdb_api_request(f"movie/{movie_id}/external_ids")
-            if external_ids:
-                movie['imdb_id'] = external_ids.get('imdb_id')
-            else:
-                movie['imdb_id'] = None
-            # Get Trailer URL
-            videos = self.tmdb_api_request(f"movie/{movie_id}/videos", params={"language": "en-US"})
-            if videos:
-                trailer_url = self.get_trailer_url(videos.get('results', []))
-                movie['trailer_url'] = trailer_url
-            else:
-                movie['trailer_url'] = None
-            return movie
-        else:
-            return None
-
-    def get_trailer_url(self, videos):
-        for video in videos:
-            if video['type'] == 'Trailer' and video['site'] == 'YouTube':
-                key = video['key']
-                return f"https://www.youtube.com/embed/{key}"
-        return None
+        return self.get_details('movie', movie_id)
 
     def get_tv_show_details(self, tv_id):
-        tv_show = self.tmdb_api_request(f"tv/{tv_id}", params={"language": "en-US"})
-        if tv_show:
-            # Get credits to obtain cast information
-            credits = self.tmdb_api_request(f"tv/{tv_id}/credits")
-            if credits:
-                tv_show['cast'] = credits.get('cast', [])
-            else:
-                tv_show['cast'] = []
-            # Get IMDb ID
-            external_ids = self.tmdb_api_request(f"tv/{tv_id}/external_ids")
-            if external_ids:
-                tv_show['imdb_id'] = external_ids.get('imdb_id')
-            else:
-                tv_show['imdb_id'] = None
-            # Get Trailer URL
-            videos = self.tmdb_api_request(f"tv/{tv_id}/videos", params={"language": "en-US"})
-            if videos:
-                trailer_url = self.get_trailer_url(videos.get('results', []))
-                tv_show['trailer_url'] = trailer_url
-            else:
-                tv_show['trailer_url'] = None
-            return tv_show
-        else:
+        return self.get_details('tv', tv_id)
+
+    def get_details(self, media_type, tmdb_id):
+        # Goes through the client so lookups other tabs already have in flight are shared
+        try:
+            return self.tmdb_client.get_details(media_type, tmdb_id)
+        except requests.exceptions.RequestException as e:
+            QMessageBox.critical(self, "Error", f"TMDB API request failed: {e}")
             return None
 
     def handle_item_action(self, item, action):
@@ -626,7 +618,7 @@ class TMDBApp(QMainWindow):
 
     def play_movie_embedded(self, movie_id):
         embed_url = f"https://vidbinge.dev/embed/movie/{movie_id}"
-        self.web_view.setUrl(QUrl(embed_url))
+        self.get_web_view().setUrl(QUrl(embed_url))
         if self.tabs.indexOf(self.player_tab) == -1:
             self.tabs.addTab(self.player_tab, "Player")
         self.tabs.setCurrentWidget(self.player_tab)
@@ -635,15 +627,14 @@ class TMDBApp(QMainWindow):
         embed_url = f"https://vidbinge.dev/embed/movie/{movie_id}"
         QDesktopServices.openUrl(QUrl(embed_url))
 
-    def add_to_watch_later(self, movie):
-        movie_id = movie.get('id')
-        if movie_id not in self.watch_later_list:
-            self.watch_later_list.append(movie_id)
-            self.save_config()
-            self.load_watch_later()
+    def add_to_watch_later(self, item):
+        media_type = 'movie' if 'title' in item else 'tv'
+        if self.watch_later.add(media_type, item):
+            self.add_watch_later_row(media_type, item)
 
     def save_settings(self):
         self.bearer_token = self.bearer_token_input.text().strip()
+        self.tmdb_client.bearer_token = self.bearer_token
         self.save_config()
         QMessageBox.information(self, "Settings", "Settings saved successfully.")
         self.load_favorites()
@@ -782,11 +773,7 @@ class TVShowItemWidget(MovieItemWidget):
         content_layout = QHBoxLayout()
         # Poster Image
         self.poster_label = QLabel()
-        pixmap = self.get_image(self.tv_show.get('poster_path'))
-        if pixmap:
-            self.poster_label.setPixmap(pixmap.scaled(150, 225, Qt.AspectRatioMode.KeepAspectRatio))
-        else:
-            self.poster_label.setText("No Image")
+        self.load_image(self.poster_label, self.tv_show.get('poster_path'), 'poster', 150, 225)
         content_layout.addWidget(self.poster_label)
 
         # TV Show Information
@@ -871,7 +858,12 @@ class TVShowItemWidget(MovieItemWidget):
             QMessageBox.information(self, "Watch Later", f"'{self.tv_show.get('name', 'TV Show')}' added to Watch Later.")
 
 if __name__ == "__main__":
+    startup_report.mark("imports")
+    prepare_application()
     app = QApplication(sys.argv)
+    startup_report.mark("qt init")
     window = TMDBApp()
     window.show()
+    startup_report.watch_first_paint(window)
+    get_stall_watchdog().start()
     sys.exit(app.exec())
@@ -0,0 +1,491 @@
+"""Local stand-in for api.themoviedb.org and image.tmdb.org.
+
+Serves the API under /3/ and images under /t/p/ from one port. Responses come
+from recorded fixtures in benchmarks/fixtures when there is one for the request,
+otherwise they are synthesized deterministically. With --upstream, misses are
+fetched from the real services and recorded as fixtures, with --proxy every
+request is forwarded to them and nothing is recorded.
+
+--profile injects faults into the traffic: 429s with Retry-After, 5xx errors,
+requests that hang past the client's read timeout, latency jitter and a
+bandwidth cap, see PROFILES.
+
+    python benchmarks/fake_tmdb.py --port 8765 --latency-ms 40
+    python benchmarks/fake_tmdb.py --proxy --profile rate_limited
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+UPSTREAM_API = "https://api.themoviedb.org/3/"
+UPSTREAM_IMAGES = "https://image.tmdb.org/t/p/"
+
+ACCOUNT_ID = 4242
+LIST_PAGES = 5
+PAGE_SIZE = 20
+GENRES = [(28, 'Action'), (12, 'Adventure'), (16, 'Animation'), (35, 'Comedy'), (80, 'Crime'),
+          (18, 'Drama'), (14, 'Fantasy'), (27, 'Horror'), (878, 'Science Fiction'), (53, 'Thriller')]
+WORDS = ['star', 'night', 'river', 'last', 'city', 'dark', 'storm', 'iron', 'ghost', 'winter',
+         'empire', 'shadow', 'road', 'fire', 'dream', 'silent', 'golden', 'lost', 'wild', 'ocean']
+NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn']
+SURNAMES = ['Smith', 'Garcia', 'Chen', 'Okafor', 'Novak', 'Silva', 'Kowalski', 'Haddad', 'Larsen', 'Ito']
+# Status codes picked from for injected server errors
+SERVER_ERRORS = (500, 502, 503)
+# Width and height per TMDB size name, heights follow the 2:3 poster ratio
+IMAGE_SIZES = {'w45': 45, 'w92': 92, 'w154': 154, 'w185': 185, 'w300': 300, 'w342': 342,
+               'w500': 500, 'w780': 780, 'h632': 421, 'original': 1000}
+
+
+def fixture_key(endpoint, params):
+    params = {k: v for k, v in params.items() if k != 'api_key'}
+    return f"{endpoint}?{json.dumps(params, sort_keys=True)}"
+
+
+def fixture_path(*parts):
+    return os.path.join(FIXTURES_DIR, *parts)
+
+
+def api_fixture_path(key):
+    return fixture_path('api', hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+
+def image_fixture_path(size, name):
+    return fixture_path('images', size, name.lstrip('/'))
+
+
+class Synthesizer:
+    # Deterministic TMDB-shaped data for requests without a recorded fixture
+
+    def __init__(self, seed=1):
+        self.seed = seed
+        # Search words a title was served with, so its details keep the same title
+        self.title_words = {}
+        self.images = {}
+        self.images_lock = threading.Lock()
+
+    def rng(self, *parts):
+        return random.Random(f"{self.seed}:" + ':'.join(str(part) for part in parts))
+
+    def title(self, tmdb_id, words=()):
+        words = words or self.title_words.get(tmdb_id, ())
+        rng = self.rng('title', tmdb_id)
+        picked = list(words) + rng.sample(WORDS, 2)
+        return ' '.join(word.capitalize() for word in picked[:3])
+
+    def summary(self, media_type, tmdb_id, words=()):
+        rng = self.rng('summary', tmdb_id)
+        date = f"{rng.randint(1970, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        item = {
+            'id': tmdb_id,
+            'overview': ' '.join(rng.choice(WORDS) for _ in range(40)).capitalize() + '.',
+            'poster_path': f"/poster{tmdb_id}.png",
+            'backdrop_path': f"/backdrop{tmdb_id}.png",
+            'genre_ids': [genre_id for genre_id, _ in rng.sample(GENRES, 2)],
+            'popularity': round(rng.uniform(1, 500), 3),
+            'vote_average': round(rng.uniform(3, 9), 1),
+            'vote_count': rng.randint(10, 20000),
+            'original_language': 'en',
+        }
+        if media_type == 'tv':
+            item.update(name=self.title(tmdb_id, words), original_name=self.title(tmdb_id, words), first_air_date=date)
+        else:
+            item.update(title=self.title(tmdb_id, words), original_title=self.title(tmdb_id, words), release_date=date)
+        return item
+
+    def details(self, media_type, tmdb_id, append):
+        rng = self.rng('details', tmdb_id)
+        data = self.summary(media_type, tmdb_id)
+        data.pop('genre_ids')
+        data['genres'] = [{'id': genre_id, 'name': name} for genre_id, name in rng.sample(GENRES, 2)]
+        data['spoken_languages'] = [{'english_name': 'English', 'iso_639_1': 'en', 'name': 'English'}]
+        data['runtime'] = rng.randint(80, 180)
+        data['tagline'] = self.title(tmdb_id + 1)
+        data['status'] = 'Released'
+        if 'credits' in append:
+            data['credits'] = {'cast': [{
+                'id': tmdb_id * 100 + order,
+                'name': f"{rng.choice(NAMES)} {rng.choice(SURNAMES)}",
+                'character': self.title(tmdb_id + order),
+                'profile_path': f"/profile{tmdb_id * 100 + order}.png",
+                'order': order,
+            } for order in range(rng.randint(15, 40))], 'crew': []}
+        if 'external_ids' in append:
+            data['external_ids'] = {'imdb_id': f"tt{tmdb_id:07d}"}
+        if 'videos' in append:
+            data['videos'] = {'results': [{'type': 'Trailer', 'site': 'YouTube', 'key': f"trailer{tmdb_id}"}]}
+        return data
+
+    def page(self, media_type, base_id, page, total_pages=LIST_PAGES, words=()):
+        tmdb_ids = [base_id + (page - 1) * PAGE_SIZE + offset for offset in range(PAGE_SIZE)]
+        if words:
+            self.title_words.update(dict.fromkeys(tmdb_ids, tuple(words)))
+        results = [self.summary(media_type, tmdb_id, words) for tmdb_id in tmdb_ids]
+        return {'page': page, 'results': results, 'total_pages': total_pages,
+                'total_results': total_pages * PAGE_SIZE}
+
+    def api(self, endpoint, params):
+        page = int(params.get('page', 1))
+        append = params.get('append_to_response', '').split(',')
+        parts = endpoint.strip('/').split('/')
+        if parts[0] in ('movie', 'tv') and len(parts) == 2 and parts[1].isdigit():
+            return self.details(parts[0], int(parts[1]), append)
+        if parts[0] in ('movie', 'tv') and len(parts) == 3 and parts[1].isdigit():
+            details = self.details(parts[0], int(parts[1]), [parts[2]])
+            return details.get(parts[2])
+        if endpoint == 'account':
+            return {'id': ACCOUNT_ID, 'username': 'benchmark', 'include_adult': False}
+        if endpoint.startswith('account/') and '/favorite/' in endpoint:
+            media_type = 'tv' if endpoint.endswith('/tv') else 'movie'
+            return self.page(media_type, 500000, page)
+        if endpoint == 'configuration':
+            return {'images': {
+                'secure_base_url': UPSTREAM_IMAGES,
+                'poster_sizes': ['w92', 'w154', 'w185', 'w342', 'w500', 'w780', 'original'],
+                'profile_sizes': ['w45', 'w185', 'h632', 'original'],
+                'backdrop_sizes': ['w300', 'w780', 'w1280', 'original'],
+            }}
+        if endpoint.startswith('genre/'):
+            return {'genres': [{'id': genre_id, 'name': name} for genre_id, name in GENRES]}
+        if endpoint.startswith('search/'):
+            media_type = 'tv' if endpoint.endswith('/tv') else 'movie'
+            words = [word for word in params.get('query', '').lower().split() if word][:2]
+            query_id = int(hashlib.sha1(' '.join(words).encode('utf-8')).hexdigest()[:5], 16)
+            return self.page(media_type, 1000000 + query_id * 100, page, total_pages=3, words=words)
+        if len(parts) == 2 and parts[0] in ('movie', 'tv'):
+            # now_playing, top_rated, popular, airing_today, ...
+            base_id = 10000 + sum(map(ord, parts[1])) * 1000
+            return self.page(parts[0], base_id, page)
+        return None
+
+    def image(self, size):
+        # One generated PNG per size, real posters are JPEGs of a similar byte size
+        with self.images_lock:
+            if size not in self.images:
+                width = IMAGE_SIZES.get(size, 342)
+                self.images[size] = make_png(width, width * 3 // 2)
+            return self.images[size]
+
+
+def make_png(width, height):
+    rows = bytearray()
+    for y in range(height):
+        rows.append(0)
+        for x in range(width):
+            rows += bytes(((x * 7 + y) % 256, (y * 3) % 256, ((x ^ y) * 5) % 256))
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(bytes(rows), 6))
+            + chunk(b'IEND', b''))
+
+
+class FaultProfile:
+    # What goes wrong with the traffic, every rate is a fraction of requests
+
+    def __init__(self, rate_limited=0.0, retry_after=1, server_errors=0.0, timeouts=0.0, hang_seconds=35,
+                 jitter_ms=0, bandwidth_kbps=0, applies_to=('api', 'image')):
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+        self.server_errors = server_errors
+        # Longer than the client's read timeout, the connection is dropped afterwards
+        self.timeouts = timeouts
+        self.hang_seconds = hang_seconds
+        # Mean of an exponentially distributed extra delay, so there is a long tail
+        self.jitter_ms = jitter_ms
+        self.bandwidth_kbps = bandwidth_kbps
+        self.applies_to = applies_to
+
+    def applies(self, kind):
+        return kind in self.applies_to
+
+
+PROFILES = {
+    'none': FaultProfile(),
+    'jitter': FaultProfile(jitter_ms=60),
+    'rate_limited': FaultProfile(rate_limited=0.3, retry_after=1, applies_to=('api',)),
+    'flaky': FaultProfile(server_errors=0.05, jitter_ms=20),
+    'outage': FaultProfile(server_errors=0.5, applies_to=('api',)),
+    'slow_images': FaultProfile(jitter_ms=150, bandwidth_kbps=256, applies_to=('image',)),
+    'stalls': FaultProfile(timeouts=0.02),
+}
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.api_requests = 0
+            self.image_requests = 0
+            self.not_modified = 0
+            self.bytes_sent = 0
+            self.endpoints = {}
+            self.faults = {}
+
+    def record_fault(self, fault):
+        with self.lock:
+            self.faults[fault] = self.faults.get(fault, 0) + 1
+
+    def record(self, kind, endpoint, status, size):
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += size
+            if kind == 'api':
+                self.api_requests += 1
+                self.endpoints[endpoint] = self.endpoints.get(endpoint, 0) + 1
+            else:
+                self.image_requests += 1
+            if status == 304:
+                self.not_modified += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'api_requests': self.api_requests,
+                'image_requests': self.image_requests,
+                'not_modified': self.not_modified,
+                'bytes_sent': self.bytes_sent,
+                'endpoints': dict(self.endpoints),
+                'faults': dict(self.faults),
+            }
+
+
+class FakeTMDBHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so connection reuse on the client side shows up in the numbers
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/__stats':
+            return self.send_body(200, json.dumps(self.server.stats.snapshot()).encode('utf-8'), 'application/json')
+        if url.path == '/__reset':
+            self.server.stats.reset()
+            return self.send_body(200, b'{}', 'application/json')
+
+        kind = 'image' if url.path.startswith('/t/p/') else 'api'
+        self.server.delay(kind)
+        if self.inject_fault(kind):
+            return
+        if kind == 'image':
+            size, _, name = url.path[len('/t/p/'):].partition('/')
+            body = self.server.image(size, '/' + name, self.headers)
+            status = 200 if body is not None else 404
+            size_sent = self.send_body(status, body or b'', 'image/png', kind=kind)
+            self.server.stats.record('image', size, status, size_sent)
+            return
+
+        if not url.path.startswith('/3/'):
+            return self.send_body(404, b'{}', 'application/json')
+        endpoint = url.path[len('/3/'):]
+        params = dict(parse_qsl(url.query))
+        body = self.server.api(endpoint, params, self.headers)
+        if body is None:
+            size_sent = self.send_body(404, b'{"status_code": 34}', 'application/json')
+            self.server.stats.record('api', endpoint, 404, size_sent)
+            return
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        status = 304 if self.headers.get('If-None-Match') == etag else 200
+        size_sent = self.send_body(status, body, 'application/json;charset=utf-8', etag, kind=kind)
+        self.server.stats.record('api', endpoint, status, size_sent)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        self.server.delay('api')
+        if self.inject_fault('api'):
+            return
+        size_sent = self.send_body(201, b'{"success": true, "status_code": 1}', 'application/json')
+        self.server.stats.record('api', urlsplit(self.path).path, 201, size_sent)
+
+    def inject_fault(self, kind):
+        # Returns True when the request has been answered with a fault
+        fault = self.server.pick_fault(kind)
+        if fault is None:
+            return False
+        self.server.stats.record_fault(fault)
+        if fault == 'timeout':
+            time.sleep(self.server.faults.hang_seconds)
+            self.close_connection = True
+            return True
+        body = json.dumps({'status_code': 25 if fault == 429 else 11,
+                           'status_message': 'Injected fault'}).encode('utf-8')
+        self.send_response(fault)
+        if fault == 429:
+            self.send_header('Retry-After', str(self.server.faults.retry_after))
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return True
+
+    def send_body(self, status, body, content_type, etag=None, kind=None):
+        self.send_response(status)
+        if content_type and status != 304:
+            self.send_header('Content-Type', content_type)
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body) if status != 304 else 0))
+        self.end_headers()
+        if status == 304:
+            return 0
+        faults = self.server.faults
+        if faults.bandwidth_kbps and faults.applies(kind):
+            # Trickled out in 50 ms slices
+            chunk_size = max(1, int(faults.bandwidth_kbps * 1024 / 20))
+            for offset in range(0, len(body), chunk_size):
+                self.wfile.write(body[offset:offset + chunk_size])
+                self.wfile.flush()
+                time.sleep(0.05)
+        else:
+            self.wfile.write(body)
+        return len(body)
+
+
+class FakeTMDBServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=0, upstream=False, proxy=False, faults=None, seed=1, verbose=False):
+        super().__init__(address, FakeTMDBHandler)
+        self.latency = latency_ms / 1000
+        self.upstream = upstream
+        self.proxy = proxy
+        self.faults = faults or PROFILES['none']
+        self.verbose = verbose
+        self.synthesizer = Synthesizer(seed)
+        self.stats = Stats()
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def set_profile(self, name):
+        self.faults = PROFILES[name]
+
+    def delay(self, kind):
+        latency = self.latency
+        if self.faults.jitter_ms and self.faults.applies(kind):
+            with self.random_lock:
+                latency += self.random.expovariate(1000 / self.faults.jitter_ms)
+        if latency:
+            time.sleep(latency)
+
+    def pick_fault(self, kind):
+        faults = self.faults
+        if not faults.applies(kind):
+            return None
+        with self.random_lock:
+            roll = self.random.random()
+            server_error = self.random.choice(SERVER_ERRORS)
+        for fault, rate in ((429, faults.rate_limited), (server_error, faults.server_errors),
+                            ('timeout', faults.timeouts)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+    def api(self, endpoint, params, headers):
+        if self.proxy:
+            response = requests.get(f"{UPSTREAM_API}{endpoint}", params=params, timeout=30,
+                                    headers={'Authorization': headers.get('Authorization', ''),
+                                             'accept': 'application/json'})
+            return response.content if response.ok else None
+        path = api_fixture_path(fixture_key(endpoint, params))
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return json.dumps(json.load(f)['body']).encode('utf-8')
+        if self.upstream:
+            response = requests.get(f"{UPSTREAM_API}{endpoint}", params=params, timeout=30,
+                                    headers={'Authorization': headers.get('Authorization', ''),
+                                             'accept': 'application/json'})
+            if response.ok:
+                save_fixture(path, {'key': fixture_key(endpoint, params), 'body': response.json()})
+                return response.content
+            return None
+        data = self.synthesizer.api(endpoint, params)
+        return json.dumps(data).encode('utf-8') if data is not None else None
+
+    def image(self, size, name, headers):
+        if self.proxy:
+            response = requests.get(f"{UPSTREAM_IMAGES}{size}{name}", timeout=30)
+            return response.content if response.ok else None
+        path = image_fixture_path(size, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return f.read()
+        if self.upstream:
+            response = requests.get(f"{UPSTREAM_IMAGES}{size}{name}", timeout=30)
+            if response.ok:
+                save_fixture(path, response.content)
+                return response.content
+            return None
+        return self.synthesizer.image(size)
+
+
+def save_fixture(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if isinstance(content, bytes):
+        with open(path, 'wb') as f:
+            f.write(content)
+    else:
+        with open(path, 'w') as f:
+            json.dump(content, f)
+
+
+def start_server(host='127.0.0.1', port=0, **kwargs):
+    server = FakeTMDBServer((host, port), **kwargs)
+    threading.Thread(target=server.serve_forever, name='fake-tmdb', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay added to every response')
+    parser.add_argument('--upstream', action='store_true',
+                        help='fetch requests without a fixture from TMDB and record them')
+    parser.add_argument('--proxy', action='store_true', help='forward every request to TMDB, record nothing')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='none', help='faults to inject')
+    parser.add_argument('--seed', type=int, default=1, help='seed for synthesized responses')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    server = FakeTMDBServer((args.host, args.port), latency_ms=args.latency_ms, upstream=args.upstream,
+                            proxy=args.proxy, faults=PROFILES[args.profile], seed=args.seed, verbose=args.verbose)
+    # The benchmark runner reads the address from this first line
+    print(f"listening on {server.base_url}", flush=True)
+    print(f"  TMDB_API_BASE_URL={server.base_url}/3/", file=sys.stderr)
+    print(f"  TMDB_IMAGE_BASE_URL={server.base_url}/t/p/", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
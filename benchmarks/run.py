@@ -0,0 +1,493 @@
+"""Headless benchmarks of the TMDBApp load flows against benchmarks/fake_tmdb.py.
+
+Every scenario runs in its own process with empty caches in a scratch directory
+and reports wall time, HTTP requests, bytes transferred and peak RSS.
+
+    python benchmarks/run.py
+    python benchmarks/run.py --latency-ms 80 --scenarios now_playing,search --repeat 3
+    python benchmarks/run.py --warm --json results.json
+    python benchmarks/run.py --profiles none,rate_limited,flaky,slow_images
+
+Under a fault profile (see fake_tmdb.PROFILES) it also reports tail latencies of
+the app's API calls and image downloads, and how failures reached the user:
+failed calls, rows left without details and the dialogs that were shown.
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from fake_tmdb import PROFILES, start_server
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIO_TIMEOUT = 60
+# How long nothing may be in flight before the app counts as settled
+IDLE_PERIOD = 0.3
+# ru_maxrss is in bytes on macOS and in kilobytes on Linux
+MAXRSS_PER_MB = 1024 * 1024 if sys.platform == 'darwin' else 1024
+
+
+class Harness:
+    # Runs inside the child process and drives one TMDBApp
+
+    def __init__(self, app, base_url):
+        self.app = app
+        self.base_url = base_url
+        self.dialogs = []
+        self.window = None
+        self.target = None
+        self.completed = True
+        self.finished = None
+        self.latencies = {'api': [], 'image': []}
+        self.errors = {'api': [], 'image': []}
+
+    def instrument(self):
+        # Times every API call and image download the app makes, with the retries and
+        # rate limit waits inside them
+        import image_loader
+        import tmdb_client
+        request = tmdb_client.TMDBClient.request
+        download_image = image_loader.download_image
+
+        def timed_request(client, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return request(client, *args, **kwargs)
+            except Exception as e:
+                self.errors['api'].append(type(e).__name__)
+                raise
+            finally:
+                self.latencies['api'].append(time.perf_counter() - started)
+
+        def timed_download_image(*args):
+            started = time.perf_counter()
+            content = download_image(*args)
+            self.latencies['image'].append(time.perf_counter() - started)
+            if content is None:
+                self.errors['image'].append('DownloadFailed')
+            return content
+
+        tmdb_client.TMDBClient.request = timed_request
+        image_loader.download_image = timed_download_image
+
+    def busy(self):
+        from image_loader import get_image_loader
+        from paged_feed import PagedFeed
+        from request_scheduler import get_image_scheduler, get_request_scheduler
+        stats = get_request_scheduler().stats()
+        image_stats = get_image_scheduler().stats()
+        feeds_busy = any(feed.threads for feed in self.window.findChildren(PagedFeed))
+        return (stats['queued'] or stats['running'] or image_stats['queued'] or image_stats['running']
+                or feeds_busy or get_image_loader().pending
+                or self.window.loader_threads)
+
+    def wait(self, condition, timeout=SCENARIO_TIMEOUT):
+        # Also gives up once nothing has been in flight for IDLE_PERIOD, a failed request
+        # can leave the condition unmet for good
+        deadline = time.perf_counter() + timeout
+        quiet_since = None
+        while True:
+            now = time.perf_counter()
+            if condition():
+                self.finished = now
+                return True
+            if self.busy():
+                quiet_since = None
+            else:
+                quiet_since = quiet_since or now
+                if now - quiet_since >= IDLE_PERIOD:
+                    self.finished = quiet_since
+                    return False
+            if now > deadline:
+                raise TimeoutError("scenario did not finish in time")
+            self.app.processEvents()
+            time.sleep(0.001)
+
+    def settle(self):
+        self.wait(lambda: False)
+
+    def rows_ready(self, list_view, count):
+        # count rows with details filled in and no poster still on its way
+        from image_loader import get_image_loader
+        model = list_view.model()
+        return (model.rowCount() >= count and all('cast' in item for item in model.items[:count])
+                and not get_image_loader().pending)
+
+    def wait_rows(self, list_view, count):
+        self.target = (list_view, count)
+        self.completed = self.wait(lambda: self.rows_ready(list_view, count))
+        return self.completed
+
+    def rows_missing(self):
+        # Target rows that never showed up or never got their details
+        if self.target is None:
+            return 0
+        list_view, count = self.target
+        items = list_view.model().items[:count]
+        return count - sum('cast' in item for item in items)
+
+    def latency_summary(self, kind):
+        latencies = sorted(self.latencies[kind])
+        errors = {}
+        for error in self.errors[kind]:
+            errors[error] = errors.get(error, 0) + 1
+        return {
+            'count': len(latencies),
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'max_ms': (latencies[-1] if latencies else 0) * 1000,
+            'errors': errors,
+        }
+
+    def server_stats(self):
+        return requests.get(f"{self.base_url}/__stats", timeout=5).json()
+
+    def start_measuring(self):
+        # Whatever the app did while getting ready is left out of the numbers
+        requests.get(f"{self.base_url}/__reset", timeout=5)
+        self.latencies = {'api': [], 'image': []}
+        self.errors = {'api': [], 'image': []}
+        self.dialogs.clear()
+
+
+def percentile(values, q):
+    # Nearest rank on sorted values
+    if not values:
+        return 0
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+
+def create_window(harness):
+    import tmdb_scraper_v1
+    harness.window = tmdb_scraper_v1.TMDBApp()
+    harness.window.show()
+    return harness.window
+
+
+def scenario_startup(harness):
+    started = time.perf_counter()
+    create_window(harness)
+    harness.app.processEvents()
+    return started
+
+
+def scenario_now_playing(harness):
+    window = create_window(harness)
+    harness.settle()
+    harness.start_measuring()
+    started = time.perf_counter()
+    window.open_now_playing_tab()
+    harness.wait_rows(window.now_playing_list, 20)
+    return started
+
+
+def scenario_now_playing_scroll(harness):
+    window = create_window(harness)
+    harness.settle()
+    harness.start_measuring()
+    started = time.perf_counter()
+    window.open_now_playing_tab()
+    scroll_bar = window.now_playing_list.verticalScrollBar()
+    for rows in (20, 40, 60, 80, 100):
+        if not harness.wait_rows(window.now_playing_list, rows):
+            break
+        scroll_bar.setValue(scroll_bar.maximum())
+    return started
+
+
+def scenario_search(harness):
+    window = create_window(harness)
+    harness.settle()
+    harness.start_measuring()
+    window.tabs.setCurrentWidget(window.search_tab)
+    started = time.perf_counter()
+    window.search_input.setText("star")
+    window.search_movies()
+    harness.wait_rows(window.search_results, 20)
+    return started
+
+
+def scenario_search_repeat(harness):
+    # Same search twice, the second one after every page of the first has been seen
+    window = create_window(harness)
+    harness.settle()
+    window.tabs.setCurrentWidget(window.search_tab)
+    window.search_input.setText("star")
+    window.search_movies()
+    # A warm run finds every page covered already and never starts the feed
+    while window.search_feed.started and (window.search_feed.has_more() or window.search_feed.waiting):
+        window.search_feed.load_more()
+        if not harness.wait(lambda: not window.search_feed.waiting):
+            break
+    harness.settle()
+    harness.start_measuring()
+    started = time.perf_counter()
+    window.search_movies()
+    harness.wait_rows(window.search_results, 20)
+    return started
+
+
+def type_keys(harness, line_edit, keys, gap=0.12):
+    # One key at a time with a typist's pause in between, shorter than the search debounce
+    for key in keys:
+        if key == '\b':
+            line_edit.backspace()
+        else:
+            line_edit.insert(key)
+        deadline = time.perf_counter() + gap
+        while time.perf_counter() < deadline:
+            harness.app.processEvents()
+            time.sleep(0.001)
+
+
+def scenario_search_typing(harness):
+    # Types a search, refines it, then deletes back to the first one, which should
+    # come back without any network
+    window = create_window(harness)
+    harness.settle()
+    window.tabs.setCurrentWidget(window.search_tab)
+    type_keys(harness, window.search_input, "star")
+    harness.wait_rows(window.search_results, 20)
+    type_keys(harness, window.search_input, " wars")
+    harness.wait_rows(window.search_results, 20)
+    harness.settle()
+    harness.start_measuring()
+    type_keys(harness, window.search_input, "\b" * 4)
+    # Timed from the last key, so the debounce is part of the number
+    started = time.perf_counter()
+    type_keys(harness, window.search_input, "\b", gap=0)
+    harness.wait(lambda: not window.search_timer.isActive())
+    harness.wait_rows(window.search_results, 20)
+    return started
+
+
+def scenario_search_filter(harness):
+    # Filters and sorts three loaded pages of a search, all of it should happen locally
+    window = create_window(harness)
+    harness.settle()
+    window.tabs.setCurrentWidget(window.search_tab)
+    window.search_input.setText("star")
+    window.search_movies()
+    scroll_bar = window.search_results.verticalScrollBar()
+    for rows in (20, 40, 60):
+        if not harness.wait_rows(window.search_results, rows):
+            break
+        scroll_bar.setValue(scroll_bar.maximum())
+    harness.settle()
+    harness.start_measuring()
+    started = time.perf_counter()
+    window.genre_input.setText("Drama")
+    window.min_rating_input.setText("5")
+    window.sort_combo.setCurrentIndex(1)
+    harness.target = None
+    harness.completed = harness.wait(lambda: window.search_results.model().rowCount() > 0)
+    return started
+
+
+def scenario_favorites(harness):
+    from PyQt6.QtCore import QSettings
+    QSettings("tmdb_app_settings.ini", QSettings.Format.IniFormat).setValue('bearer_token', 'benchmark')
+    started = time.perf_counter()
+    window = create_window(harness)
+    # The fake account has 5 pages of favorites, 10 of each are shown
+    harness.wait_rows(window.favorites_list, 5 * window.results_per_page)
+    return started
+
+
+def scenario_watch_later(harness):
+    from watch_later_store import WatchLaterStore
+    store = WatchLaterStore()
+    for tmdb_id in range(1, 2001):
+        store.add('movie', {'id': tmdb_id, 'title': f"Movie {tmdb_id}", 'overview': 'Overview',
+                            'poster_path': f"/poster{tmdb_id}.png", 'cast': [], 'genres': []})
+    window = create_window(harness)
+    harness.settle()
+    harness.start_measuring()
+    started = time.perf_counter()
+    window.open_watch_later_tab()
+    harness.wait_rows(window.watch_later_list_widget, 2000)
+    return started
+
+
+SCENARIOS = {
+    'startup': scenario_startup,
+    'now_playing': scenario_now_playing,
+    'now_playing_scroll': scenario_now_playing_scroll,
+    'search': scenario_search,
+    'search_repeat': scenario_search_repeat,
+    'search_typing': scenario_search_typing,
+    'search_filter': scenario_search_filter,
+    'favorites': scenario_favorites,
+    'watch_later': scenario_watch_later,
+}
+
+
+def run_child(name, workdir, base_url):
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_ROOT)
+    from PyQt6.QtWidgets import QApplication, QMessageBox
+    from web_engine import prepare_application
+
+    prepare_application()
+    app = QApplication([sys.argv[0]])
+    harness = Harness(app, base_url)
+    harness.instrument()
+    # Modal dialogs would block a headless run, they are counted instead
+    for kind in ('critical', 'warning', 'information'):
+        setattr(QMessageBox, kind, staticmethod(
+            lambda *args, kind=kind, **kwargs: harness.dialogs.append((kind, str(args[1:])))))
+
+    started = SCENARIOS[name](harness)
+    wall_time = (harness.finished or time.perf_counter()) - started
+    harness.settle()
+    result = {
+        'scenario': name,
+        'wall_ms': wall_time * 1000,
+        'completed': harness.completed,
+        'rows_missing': harness.rows_missing(),
+        'api': harness.latency_summary('api'),
+        'image': harness.latency_summary('image'),
+        'server': harness.server_stats(),
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / MAXRSS_PER_MB,
+        'dialogs': harness.dialogs,
+    }
+    harness.window.close()
+    print("RESULT " + json.dumps(result), flush=True)
+
+
+def run_scenario(name, base_url, warm=False):
+    workdir = tempfile.mkdtemp(prefix=f"tmdb-bench-{name}-")
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen',
+               TMDB_API_BASE_URL=f"{base_url}/3/", TMDB_IMAGE_BASE_URL=f"{base_url}/t/p/")
+    command = [sys.executable, os.path.abspath(__file__), '--child', name, '--workdir', workdir, '--base-url', base_url]
+    try:
+        # A warm run goes a second time over the caches the first run left on disk
+        for _ in range(2 if warm else 1):
+            output = subprocess.run(command, env=env, capture_output=True, text=True, timeout=SCENARIO_TIMEOUT * 2)
+            lines = [line for line in output.stdout.splitlines() if line.startswith("RESULT ")]
+            if output.returncode != 0 or not lines:
+                raise RuntimeError(f"{name} failed:\n{output.stderr[-2000:]}")
+        return json.loads(lines[-1][len("RESULT "):])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def summarize(profile, runs):
+    # Counts come from the first run, times are the median over all of them
+    first = runs[0]
+    server = first['server']
+    faults = server['faults']
+    return {
+        'profile': profile,
+        'scenario': first['scenario'],
+        'wall_ms': statistics.median(run['wall_ms'] for run in runs),
+        'wall_ms_runs': [run['wall_ms'] for run in runs],
+        'completed': all(run['completed'] for run in runs),
+        'rows_missing': first['rows_missing'],
+        'api_requests': server['api_requests'],
+        'image_requests': server['image_requests'],
+        'not_modified': server['not_modified'],
+        'kb_transferred': server['bytes_sent'] / 1024,
+        'api_p95_ms': statistics.median(run['api']['p95_ms'] for run in runs),
+        'api_p99_ms': statistics.median(run['api']['p99_ms'] for run in runs),
+        'image_p95_ms': statistics.median(run['image']['p95_ms'] for run in runs),
+        'failed_calls': sum(first['api']['errors'].values()) + sum(first['image']['errors'].values()),
+        'injected_429': faults.get('429', 0),
+        'injected_5xx': sum(count for fault, count in faults.items() if fault.startswith('5')),
+        'injected_timeouts': faults.get('timeout', 0),
+        'peak_rss_mb': max(run['peak_rss_mb'] for run in runs),
+        'dialogs': first['dialogs'],
+        'api': first['api'],
+        'image': first['image'],
+        'endpoints': server['endpoints'],
+    }
+
+
+# title, result field, width, format
+COLUMNS = [
+    ('profile', 'profile', 13, ''), ('scenario', 'scenario', 19, ''), ('wall ms', 'wall_ms', 8, '.0f'),
+    ('done', 'completed', 4, ''), ('api', 'api_requests', 4, ''), ('img', 'image_requests', 4, ''),
+    ('KB', 'kb_transferred', 7, '.0f'), ('api p95', 'api_p95_ms', 7, '.0f'), ('api p99', 'api_p99_ms', 7, '.0f'),
+    ('img p95', 'image_p95_ms', 7, '.0f'), ('429', 'injected_429', 4, ''), ('5xx', 'injected_5xx', 4, ''),
+    ('hang', 'injected_timeouts', 4, ''), ('failed', 'failed_calls', 6, ''), ('missing', 'rows_missing', 7, ''),
+    ('dialogs', 'dialogs', 7, ''), ('RSS MB', 'peak_rss_mb', 6, '.0f'),
+]
+
+
+def print_table(results):
+    print(' '.join(f"{title:<{width}}" if index < 2 else f"{title:>{width}}"
+                   for index, (title, _, width, _) in enumerate(COLUMNS)))
+    for result in results:
+        cells = []
+        for index, (_, field, width, spec) in enumerate(COLUMNS):
+            value = result[field]
+            if field == 'completed':
+                value = 'yes' if value else 'no'
+            elif field == 'dialogs':
+                value = len(value)
+            cells.append(f"{value:<{width}{spec}}" if index < 2 else f"{value:>{width}{spec}}")
+        print(' '.join(cells))
+    # Dialogs are how errors reach the user, show what they said
+    for result in results:
+        for kind, message in result['dialogs'][:3]:
+            print(f"  {result['profile']}/{result['scenario']} {kind}: {message[:120]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"comma separated, out of {', '.join(SCENARIOS)}")
+    parser.add_argument('--latency-ms', type=float, default=40, help='delay the fake server adds to every response')
+    parser.add_argument('--profiles', default='none',
+                        help=f"fault profiles to run every scenario under, out of {', '.join(PROFILES)}")
+    parser.add_argument('--repeat', type=int, default=1, help='runs per scenario, the median wall time is reported')
+    parser.add_argument('--warm', action='store_true', help='measure a second run over the caches of a first one')
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.workdir, args.base_url)
+        return
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    profiles = [profile.strip() for profile in args.profiles.split(',') if profile.strip()]
+    unknown = [profile for profile in profiles if profile not in PROFILES]
+    if unknown:
+        parser.error(f"unknown profiles: {', '.join(unknown)}")
+
+    server = start_server(latency_ms=args.latency_ms)
+    print(f"fake TMDB at {server.base_url}, {args.latency_ms:g} ms latency{', warm caches' if args.warm else ''}\n")
+    results = []
+    for profile in profiles:
+        server.set_profile(profile)
+        for name in names:
+            runs = [run_scenario(name, server.base_url, args.warm) for _ in range(args.repeat)]
+            results.append(summarize(profile, runs))
+    server.shutdown()
+
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'latency_ms': args.latency_ms, 'warm': args.warm, 'profiles': profiles, 'results': results},
+                      f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_CATALOG_PATH = 'catalog.sqlite3'
+# Only the top of the cast list is kept, the rest is rarely looked at and bloats every row
+TOP_CAST = 10
+# How long the pages of a search answered by TMDB keep being answered from the catalog
+COVERAGE_TTL = 7 * 24 * 3600
+
+
+class Catalog:
+    def __init__(self, path=DEFAULT_CATALOG_PATH, coverage_ttl=COVERAGE_TTL):
+        self.path = path
+        self.coverage_ttl = coverage_ttl
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS titles (
+                id INTEGER PRIMARY KEY,
+                media_type TEXT NOT NULL,
+                tmdb_id INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                overview TEXT NOT NULL,
+                genres TEXT NOT NULL,
+                genre_ids TEXT NOT NULL,
+                cast_names TEXT NOT NULL,
+                year INTEGER,
+                imdb_id TEXT,
+                trailer_url TEXT,
+                popularity REAL NOT NULL DEFAULT 0,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                UNIQUE (media_type, tmdb_id)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS titles_fts USING fts5(
+                title, overview, genres, cast_names,
+                content='titles', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS titles_ai AFTER INSERT ON titles BEGIN
+                INSERT INTO titles_fts (rowid, title, overview, genres, cast_names)
+                VALUES (new.id, new.title, new.overview, new.genres, new.cast_names);
+            END;
+            CREATE TRIGGER IF NOT EXISTS titles_ad AFTER DELETE ON titles BEGIN
+                INSERT INTO titles_fts (titles_fts, rowid, title, overview, genres, cast_names)
+                VALUES ('delete', old.id, old.title, old.overview, old.genres, old.cast_names);
+            END;
+            CREATE TRIGGER IF NOT EXISTS titles_au AFTER UPDATE ON titles BEGIN
+                INSERT INTO titles_fts (titles_fts, rowid, title, overview, genres, cast_names)
+                VALUES ('delete', old.id, old.title, old.overview, old.genres, old.cast_names);
+                INSERT INTO titles_fts (rowid, title, overview, genres, cast_names)
+                VALUES (new.id, new.title, new.overview, new.genres, new.cast_names);
+            END;
+            CREATE TABLE IF NOT EXISTS searches (
+                key TEXT PRIMARY KEY,
+                media_type TEXT NOT NULL,
+                tmdb_ids TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                pages INTEGER NOT NULL DEFAULT 1,
+                total_pages INTEGER NOT NULL DEFAULT 1
+            );
+        """)
+        # Catalogs from before per page coverage only held searches seen to the last page
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(searches)")}
+        for column in ('pages', 'total_pages'):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE searches ADD COLUMN {column} INTEGER NOT NULL DEFAULT 1")
+        self.conn.commit()
+
+    @staticmethod
+    def make_search_key(media_type, params):
+        # TMDB search ignores case and surrounding blanks, so the key does too
+        params = {k: v for k, v in (params or {}).items() if v not in (None, '') and k != 'page'}
+        if 'query' in params:
+            params['query'] = ' '.join(str(params['query']).lower().split())
+        return f"{media_type}?{json.dumps(params, sort_keys=True, default=str)}"
+
+    def add(self, media_type, details):
+        # Details as normalize_details returns them
+        details = dict(details, cast=details.get('cast', [])[:TOP_CAST])
+        release_date = details.get('release_date') or details.get('first_air_date') or ''
+        year = release_date[:4]
+        titles = dict.fromkeys([details.get('title') or details.get('name') or '',
+                                details.get('original_title') or details.get('original_name') or ''])
+        row = (
+            media_type,
+            details['id'],
+            ' / '.join(title for title in titles if title),
+            details.get('overview') or '',
+            ' '.join(genre['name'] for genre in details.get('genres', [])),
+            ''.join(f" {genre['id']} " for genre in details.get('genres', [])),
+            ' '.join(member.get('name', '') for member in details['cast']),
+            int(year) if year.isdigit() else None,
+            details.get('imdb_id'),
+            details.get('trailer_url'),
+            details.get('popularity') or 0,
+            json.dumps(details),
+            time.time(),
+        )
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO titles (media_type, tmdb_id, title, overview, genres, genre_ids, cast_names,
+                                    year, imdb_id, trailer_url, popularity, data, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (media_type, tmdb_id) DO UPDATE SET
+                    title = excluded.title, overview = excluded.overview, genres = excluded.genres,
+                    genre_ids = excluded.genre_ids,
+                    cast_names = excluded.cast_names, year = excluded.year, imdb_id = excluded.imdb_id,
+                    trailer_url = excluded.trailer_url, popularity = excluded.popularity,
+                    data = excluded.data, updated_at = excluded.updated_at
+            """, row)
+            self.conn.commit()
+
+    def get_many(self, media_type, tmdb_ids):
+        # Stored details in the order of tmdb_ids, titles not in the catalog are skipped
+        if not tmdb_ids:
+            return []
+        placeholders = ', '.join('?' * len(tmdb_ids))
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT tmdb_id, data FROM titles WHERE media_type = ? AND tmdb_id IN ({placeholders})",
+                (media_type, *tmdb_ids)
+            ).fetchall()
+        found = {tmdb_id: data for tmdb_id, data in rows}
+        return [json.loads(found[tmdb_id]) for tmdb_id in tmdb_ids if tmdb_id in found]
+
+    def search(self, text, media_type='movie', year=None, genre=None, limit=200):
+        # Every word has to match somewhere in title, overview, genres or cast, as a prefix
+        words = re.findall(r'\w+', text.lower())
+        if not words:
+            return []
+        match = ' '.join(f'"{word}"*' for word in words)
+        sql = """
+            SELECT titles.data FROM titles_fts JOIN titles ON titles.id = titles_fts.rowid
+            WHERE titles_fts MATCH ? AND titles.media_type = ?
+        """
+        args = [match, media_type]
+        if year and str(year).isdigit():
+            sql += " AND titles.year = ?"
+            args.append(int(year))
+        if genre:
+            # Genre filter takes a name ("drama") or a TMDB genre id ("18")
+            sql += " AND (titles.genres LIKE ? OR titles.genre_ids LIKE ?)"
+            args += [f"%{genre}%", f"% {genre} %"]
+        # Title hits rank above overview and cast hits
+        sql += " ORDER BY bm25(titles_fts, 10.0, 1.0, 2.0, 3.0), titles.popularity DESC LIMIT ?"
+        args.append(limit)
+        with self.lock:
+            rows = self.conn.execute(sql, args).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def mark_covered(self, key, media_type, tmdb_ids, pages=1, total_pages=1):
+        # tmdb_ids are the results of the first pages of the search, in order. Page 1 starts
+        # the coverage over, later pages only extend one that ends right before them
+        with self.lock:
+            if pages == 1:
+                self.conn.execute("""
+                    INSERT OR REPLACE INTO searches (key, media_type, tmdb_ids, fetched_at, pages, total_pages)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (key, media_type, json.dumps(list(tmdb_ids)), time.time(), pages, total_pages))
+            else:
+                self.conn.execute(
+                    "UPDATE searches SET tmdb_ids = ?, pages = ?, total_pages = ? WHERE key = ? AND pages = ?",
+                    (json.dumps(list(tmdb_ids)), pages, total_pages, key, pages - 1)
+                )
+            self.conn.commit()
+
+    def covered(self, key):
+        # (TMDB's result ids, pages seen, total pages) for a search it answered recently, as
+        # long as every one of those ids made it into the catalog, otherwise None
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT media_type, tmdb_ids, fetched_at, pages, total_pages FROM searches WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[2] + self.coverage_ttl < time.time():
+            return None
+        media_type, tmdb_ids, pages, total_pages = row[0], json.loads(row[1]), row[3], row[4]
+        if not tmdb_ids:
+            return tmdb_ids, pages, total_pages
+        placeholders = ', '.join('?' * len(tmdb_ids))
+        with self.lock:
+            count = self.conn.execute(
+                f"SELECT COUNT(*) FROM titles WHERE media_type = ? AND tmdb_id IN ({placeholders})",
+                (media_type, *tmdb_ids)
+            ).fetchone()[0]
+        return (tmdb_ids, pages, total_pages) if count == len(set(tmdb_ids)) else None
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM titles").fetchone()[0]
@@ -0,0 +1,96 @@
+import logging
+import threading
+
+import requests
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from request_scheduler import PRIORITY_NORMAL, get_request_scheduler
+from tracing import tracer
+
+
+logger = logging.getLogger(__name__)
+
+# TMDB allows about 20 simultaneous connections per IP before it starts refusing them
+MAX_CONCURRENCY = 20
+
+
+class DetailHydrator(QObject):
+    # batch id, position in the batch, details dict
+    item_loaded = pyqtSignal(int, int, dict)
+    # batch id, number of failed items, last error message
+    batch_finished = pyqtSignal(int, int, str)
+
+    def __init__(self, client, max_workers=8, scheduler=None, catalog=None, parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.catalog = catalog
+        self.scheduler = scheduler or get_request_scheduler()
+        self.lock = threading.Lock()
+        self.batches = {}
+        self.next_batch_id = 1
+        self.set_max_workers(max_workers)
+
+    def set_max_workers(self, max_workers):
+        self.max_workers = max(1, min(int(max_workers), MAX_CONCURRENCY))
+        self.scheduler.set_max_workers(self.max_workers)
+
+    def hydrate(self, media_type, tmdb_ids, start=0, priority=PRIORITY_NORMAL, positions=None):
+        # Items are reported at start + offset, or at positions[offset] when given
+        with self.lock:
+            batch_id = self.next_batch_id
+            self.next_batch_id += 1
+            batch = {'remaining': len(tmdb_ids), 'failed': 0, 'error': '', 'cancelled': False, 'futures': []}
+            self.batches[batch_id] = batch
+        if not tmdb_ids:
+            self.finish(batch_id)
+            return batch_id
+        for offset, tmdb_id in enumerate(tmdb_ids):
+            position = positions[offset] if positions else start + offset
+            future = self.scheduler.submit(self.fetch, batch_id, position, media_type, tmdb_id, priority=priority)
+            batch['futures'].append(future)
+        return batch_id
+
+    def fetch(self, batch_id, position, media_type, tmdb_id):
+        batch = self.batches.get(batch_id)
+        if batch is None or batch['cancelled']:
+            return
+        try:
+            with tracer.span('details', 'hydrate', media_type=media_type, tmdb_id=tmdb_id, position=position):
+                details = self.client.get_details(media_type, tmdb_id)
+                if details and self.catalog:
+                    self.catalog.add(media_type, details)
+            if details and not batch['cancelled']:
+                self.item_loaded.emit(batch_id, position, details)
+        except Exception as e:
+            # Bad JSON or a catalog error loses the row just like a failed request does
+            if not isinstance(e, requests.exceptions.RequestException):
+                logger.exception("Loading %s %s failed", media_type, tmdb_id)
+            with self.lock:
+                batch['failed'] += 1
+                batch['error'] = str(e)
+        finally:
+            with self.lock:
+                batch['remaining'] -= 1
+                done = batch['remaining'] <= 0
+            if done:
+                self.finish(batch_id)
+
+    def finish(self, batch_id):
+        with self.lock:
+            batch = self.batches.pop(batch_id, None)
+        if batch and not batch['cancelled']:
+            self.batch_finished.emit(batch_id, batch['failed'], batch['error'])
+
+    def cancel(self, batch_id):
+        with self.lock:
+            batch = self.batches.pop(batch_id, None)
+        if batch:
+            batch['cancelled'] = True
+            for future in batch['futures']:
+                future.cancel()
+
+    def shutdown(self):
+        with self.lock:
+            batch_ids = list(self.batches)
+        for batch_id in batch_ids:
+            self.cancel(batch_id)
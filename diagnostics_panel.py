@@ -0,0 +1,165 @@
+import math
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+    QHeaderView, QFileDialog, QMessageBox
+)
+
+from metrics import BUCKETS, metrics
+from stall_watchdog import get_stall_watchdog
+
+
+REFRESH_INTERVAL_MS = 1000
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+def shared_rate(flight):
+    # Share of single flight lookups that joined one already in flight
+    shared = metrics.counter_total('single_flight_calls_total', flight=flight, outcome='shared')
+    total = metrics.counter_total('single_flight_calls_total', flight=flight)
+    return shared / total if total else 0.0
+
+
+def sparkline(buckets):
+    # One character per histogram bucket, height relative to the fullest bucket
+    peak = max(buckets) or 1
+    levels = len(SPARK_BLOCKS)
+    return ''.join(SPARK_BLOCKS[math.ceil(count * levels / peak) - 1] if count else '·' for count in buckets)
+
+
+def bucket_tooltip(buckets):
+    bounds = [f"≤ {bound * 1000:g} ms" for bound in BUCKETS] + [f"> {BUCKETS[-1] * 1000:g} ms"]
+    return '\n'.join(f"{bound}: {count}" for bound, count in zip(bounds, buckets) if count)
+
+
+def format_labels(labels):
+    return ', '.join(f"{name}={value}" for name, value in labels.items())
+
+
+class DiagnosticsPanel(QWidget):
+    # Live view of metrics.metrics, refreshed while the panel is visible
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout()
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+        self.bandwidth_label = QLabel()
+        layout.addWidget(self.bandwidth_label)
+
+        self.histogram_table = QTableWidget(0, 7)
+        self.histogram_table.setHorizontalHeaderLabels(
+            ["Timing", "Labels", "Count", "p50 ms", "p95 ms", "Max ms", "Histogram (1 ms … 10 s)"])
+        self.histogram_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.histogram_table.verticalHeader().setVisible(False)
+        self.histogram_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.histogram_table, 3)
+
+        self.counter_table = QTableWidget(0, 3)
+        self.counter_table.setHorizontalHeaderLabels(["Counter", "Labels", "Value"])
+        self.counter_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.counter_table.verticalHeader().setVisible(False)
+        self.counter_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.counter_table, 1)
+
+        self.stall_table = QTableWidget(0, 4)
+        self.stall_table.setHorizontalHeaderLabels(["GUI thread blocked in", "Stalls", "Total ms", "Worst ms"])
+        self.stall_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.stall_table.verticalHeader().setVisible(False)
+        self.stall_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.stall_table, 1)
+
+        buttons_layout = QHBoxLayout()
+        export_button = QPushButton("Export Prometheus...")
+        export_button.clicked.connect(self.export_prometheus)
+        reset_button = QPushButton("Reset")
+        reset_button.clicked.connect(self.reset)
+        buttons_layout.addStretch()
+        buttons_layout.addWidget(reset_button)
+        buttons_layout.addWidget(export_button)
+        layout.addLayout(buttons_layout)
+        self.setLayout(layout)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+    def refresh(self):
+        histograms = metrics.histogram_rows()
+        counters = metrics.counter_rows()
+
+        api_calls = {}
+        image_downloads = {}
+        for name, labels, count, *_ in histograms:
+            if name == 'api_request_seconds':
+                api_calls[labels['cache']] = api_calls.get(labels['cache'], 0) + count
+            elif name == 'image_request_seconds' and labels['cache'] == 'download':
+                image_downloads[labels['size']] = image_downloads.get(labels['size'], 0) + count
+        total_calls = sum(api_calls.values())
+        cache_hits = api_calls.get('fresh', 0) + api_calls.get('revalidated', 0)
+        api_bytes = metrics.counter_total('api_response_bytes_total')
+        image_bytes = metrics.counter_total('image_response_bytes_total')
+        self.summary_label.setText(
+            f"API calls: {total_calls}, {cache_hits / total_calls if total_calls else 0:.0%} from cache "
+            f"({api_calls.get('revalidated', 0)} revalidated), "
+            f"{metrics.counter_total('api_retries_total')} retries, {metrics.counter_total('api_errors_total')} errors   "
+            f"Received: API {api_bytes / 1024:.0f} KB, images {image_bytes / 1024:.0f} KB, "
+            f"{metrics.counter_total('image_errors_total')} failed images   "
+            f"Duplicate lookups shared: details {shared_rate('details'):.0%}, images {shared_rate('images'):.0%}"
+        )
+        # Image bandwidth per TMDB size variant
+        per_size = []
+        for size, downloads in sorted(image_downloads.items()):
+            size_bytes = metrics.counter_total('image_response_bytes_total', size=size)
+            per_size.append(f"{size} {size_bytes / 1024:.0f} KB in {downloads} ({size_bytes / downloads / 1024:.1f} KB each)")
+        self.bandwidth_label.setText("Image downloads: " + (', '.join(per_size) or "none yet"))
+
+        self.histogram_table.setRowCount(len(histograms))
+        for row, (name, labels, count, p50, p95, peak, buckets) in enumerate(histograms):
+            values = [name, format_labels(labels), str(count), f"{p50 * 1000:.1f}", f"{p95 * 1000:.1f}",
+                      f"{peak * 1000:.1f}", sparkline(buckets)]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column == 6:
+                    item.setToolTip(bucket_tooltip(buckets))
+                self.histogram_table.setItem(row, column, item)
+
+        self.counter_table.setRowCount(len(counters))
+        for row, (name, labels, value) in enumerate(counters):
+            for column, text in enumerate([name, format_labels(labels), str(value)]):
+                self.counter_table.setItem(row, column, QTableWidgetItem(text))
+
+        offenders = get_stall_watchdog().worst_offenders()
+        self.stall_table.setRowCount(len(offenders))
+        for row, (chain, count, total, worst, stack) in enumerate(offenders):
+            for column, text in enumerate([chain, str(count), f"{total * 1000:.0f}", f"{worst * 1000:.0f}"]):
+                item = QTableWidgetItem(text)
+                # Full stack of the worst stall
+                item.setToolTip(stack)
+                self.stall_table.setItem(row, column, item)
+
+    def reset(self):
+        metrics.reset()
+        get_stall_watchdog().reset()
+        self.refresh()
+
+    def export_prometheus(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Metrics", "tmdb_metrics.prom",
+                                              "Prometheus text (*.prom *.txt);;All files (*)")
+        if not path:
+            return
+        try:
+            metrics.write_prometheus(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Could not write {path}:\n{e}")
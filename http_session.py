@@ -0,0 +1,46 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Connect and read timeouts in seconds for every call made through the session
+REQUEST_TIMEOUT = (5, 30)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def create_session(pool_size=20, retries=3, backoff_factor=0.5, proxies=None):
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        # Hand the last response back so raise_for_status reports the real status
+        raise_on_status=False
+    )
+    # One connection pool per host (api.themoviedb.org, image.tmdb.org, ...), each
+    # keeping up to pool_size keep-alive connections
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if proxies:
+        session.proxies.update(proxies)
+    return session
+
+
+session = None
+
+
+def get_session():
+    global session
+    if session is None:
+        session = create_session()
+    return session
+
+
+def configure_session(pool_size=20, retries=3, backoff_factor=0.5, proxies=None):
+    # The old session is left for requests still in flight on it to finish
+    global session
+    session = create_session(pool_size, retries, backoff_factor, proxies)
+    return session
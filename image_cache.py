@@ -0,0 +1,195 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+DEFAULT_CACHE_DIR = 'image_cache'
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_DISK_BYTES = 500 * 1024 * 1024
+DEFAULT_PLACEHOLDER_BYTES = 16 * 1024 * 1024
+# Tiny variant shown blurred while the real image loads
+PLACEHOLDER_SIZE = 'w92'
+
+
+class ImageCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, memory_bytes=DEFAULT_MEMORY_BYTES, disk_bytes=DEFAULT_DISK_BYTES,
+                 placeholder_bytes=DEFAULT_PLACEHOLDER_BYTES):
+        self.cache_dir = cache_dir
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.placeholder_bytes = placeholder_bytes
+        self.lock = threading.Lock()
+
+        # Decoded pixmaps, most recently used last. Only used from the GUI thread.
+        self.memory = OrderedDict()
+        self.memory_used = 0
+        # Placeholders by image path, with a budget of their own so evicting full size
+        # images never takes them along
+        self.placeholders = OrderedDict()
+        self.placeholders_used = 0
+
+        self.counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'memory_evictions': 0,
+            'disk_evictions': 0,
+            'placeholder_hits': 0,
+            'placeholder_evictions': 0,
+        }
+
+        # Raw image bytes are stored once per content hash, the index maps (path, size) to a hash
+        os.makedirs(os.path.join(cache_dir, 'objects'), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite3'), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS images (
+                key TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS images_last_access ON images (last_access)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(path, size):
+        return f"{size}{path}"
+
+    def object_path(self, digest):
+        return os.path.join(self.cache_dir, 'objects', digest[:2], digest)
+
+    def count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    # Memory tier
+
+    def get_pixmap(self, key):
+        pixmap = self.memory.get(key)
+        if pixmap is None:
+            return None
+        self.memory.move_to_end(key)
+        self.count('memory_hits')
+        return pixmap
+
+    def put_pixmap(self, key, pixmap):
+        cost = self.pixmap_cost(pixmap)
+        if cost > self.memory_bytes:
+            return
+        old = self.memory.pop(key, None)
+        if old is not None:
+            self.memory_used -= self.pixmap_cost(old)
+        self.memory[key] = pixmap
+        self.memory_used += cost
+        while self.memory_used > self.memory_bytes:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_used -= self.pixmap_cost(evicted)
+            self.count('memory_evictions')
+
+    def get_placeholder(self, path):
+        pixmap = self.placeholders.get(path)
+        if pixmap is None:
+            return None
+        self.placeholders.move_to_end(path)
+        self.count('placeholder_hits')
+        return pixmap
+
+    def put_placeholder(self, path, pixmap):
+        old = self.placeholders.pop(path, None)
+        if old is not None:
+            self.placeholders_used -= self.pixmap_cost(old)
+        self.placeholders[path] = pixmap
+        self.placeholders_used += self.pixmap_cost(pixmap)
+        while self.placeholders_used > self.placeholder_bytes:
+            _, evicted = self.placeholders.popitem(last=False)
+            self.placeholders_used -= self.pixmap_cost(evicted)
+            self.count('placeholder_evictions')
+
+    @staticmethod
+    def pixmap_cost(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    # Disk tier, safe to use from worker threads
+
+    def get_bytes(self, key):
+        with self.lock:
+            row = self.conn.execute("SELECT digest FROM images WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.conn.execute("UPDATE images SET last_access = ? WHERE key = ?", (time.time(), key))
+                self.conn.commit()
+        if row is None:
+            self.count('misses')
+            return None
+        try:
+            with open(self.object_path(row[0]), 'rb') as f:
+                data = f.read()
+        except OSError:
+            self.count('misses')
+            return None
+        self.count('disk_hits')
+        return data
+
+    def put_bytes(self, key, data):
+        digest = hashlib.sha1(data).hexdigest()
+        object_path = self.object_path(digest)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            tmp_path = f"{object_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, object_path)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?)",
+                (key, digest, len(data), time.time())
+            )
+            self.evict_disk()
+            self.conn.commit()
+
+    def evict_disk(self):
+        # Sizes are summed per distinct object so shared content is only counted once
+        total = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT digest, MAX(size) AS size FROM images GROUP BY digest)"
+        ).fetchone()[0]
+        if total <= self.disk_bytes:
+            return
+        # Placeholder variants are a few KB each, they go last
+        rows = self.conn.execute(
+            "SELECT key, digest, size FROM images ORDER BY key LIKE ? ASC, last_access ASC", (f"{PLACEHOLDER_SIZE}/%",)
+        ).fetchall()
+        for key, digest, size in rows:
+            if total <= self.disk_bytes:
+                break
+            self.conn.execute("DELETE FROM images WHERE key = ?", (key,))
+            self.counters['disk_evictions'] += 1
+            still_used = self.conn.execute("SELECT 1 FROM images WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+            if not still_used:
+                total -= size
+                try:
+                    os.remove(self.object_path(digest))
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats['disk_entries'] = self.conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+        stats['memory_entries'] = len(self.memory)
+        stats['memory_bytes'] = self.memory_used
+        stats['placeholder_entries'] = len(self.placeholders)
+        stats['placeholder_bytes'] = self.placeholders_used
+        return stats
+
+
+image_cache = None
+
+
+def get_image_cache():
+    global image_cache
+    if image_cache is None:
+        image_cache = ImageCache()
+    return image_cache
@@ -0,0 +1,214 @@
+import os
+import time
+
+import requests
+from PyQt6.QtCore import Qt, QObject, pyqtSignal
+from PyQt6.QtGui import QGuiApplication, QImage, QPixmap
+
+from http_session import REQUEST_TIMEOUT, get_session
+from image_cache import PLACEHOLDER_SIZE, ImageCache, get_image_cache
+from metrics import metrics
+from request_scheduler import PRIORITY_VISIBLE, get_image_scheduler
+from single_flight import SingleFlight
+from tracing import tracer
+
+
+IMAGE_BASE_URL = os.environ.get("TMDB_IMAGE_BASE_URL", "https://image.tmdb.org/t/p/")
+
+image_flight = SingleFlight('images')
+
+# Placeholders are kept this small, so thousands of them fit in memory
+PLACEHOLDER_BOX = (30, 45)
+
+
+def fetch_image_bytes(path, size, cache=None):
+    # Disk cache first, then one download per image however many threads want it
+    cache = cache or get_image_cache()
+    cache_key = ImageCache.make_key(path, size)
+    started = time.perf_counter()
+    data = cache.get_bytes(cache_key)
+    source = 'disk'
+    if data is None:
+        data = image_flight.do(cache_key, download_image, path, size, cache)
+        source = 'download'
+    metrics.observe('image_request_seconds', time.perf_counter() - started, size=size, cache=source)
+    return data
+
+
+def download_image(path, size, cache):
+    cache_key = ImageCache.make_key(path, size)
+    try:
+        response = get_session().get(f"{IMAGE_BASE_URL}{size}{path}", timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException:
+        metrics.increment('image_errors_total', size=size)
+        return None
+    metrics.increment('image_response_bytes_total', len(response.content), size=size)
+    cache.put_bytes(cache_key, response.content)
+    return response.content
+
+
+def device_pixel_ratio():
+    app = QGuiApplication.instance()
+    screen = app.primaryScreen() if app else None
+    return screen.devicePixelRatio() if screen else 1.0
+
+
+def thumbnail_key(path, size, box, ratio):
+    # Scaled copies are cached per display box and device pixel ratio
+    if box is None:
+        return ImageCache.make_key(path, size)
+    return f"{ImageCache.make_key(path, size)}@{box[0]}x{box[1]}@{ratio:g}x"
+
+
+def is_placeholder(key):
+    return key[1] == PLACEHOLDER_SIZE and key[2] == PLACEHOLDER_BOX
+
+
+def decode_image(data, size, box=None, ratio=1.0):
+    # Worker side: bytes to a QImage already fitted into box at the screen's pixel density
+    image = QImage()
+    with metrics.timed('image_decode_seconds', size=size):
+        decoded = image.loadFromData(data)
+    if not decoded:
+        return None
+    if box is not None:
+        with metrics.timed('image_scale_seconds', size=size):
+            image = image.scaled(round(box[0] * ratio), round(box[1] * ratio), Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+        image.setDevicePixelRatio(ratio)
+    return image
+
+
+def scale_placeholder(tiny, box, ratio):
+    with metrics.timed('image_scale_seconds', size=PLACEHOLDER_SIZE):
+        pixmap = tiny.scaled(round(box[0] * ratio), round(box[1] * ratio), Qt.AspectRatioMode.KeepAspectRatio,
+                             Qt.TransformationMode.SmoothTransformation)
+    pixmap.setDevicePixelRatio(ratio)
+    return pixmap
+
+
+class ImageLoader(QObject):
+    # (path, size, box, ratio) key, decoded and scaled image (None when the download failed)
+    image_ready = pyqtSignal(object, object)
+
+    def __init__(self, cache=None, scheduler=None, parent=None):
+        super().__init__(parent)
+        self.cache = cache or get_image_cache()
+        # Workers of its own, images someone is looking at go first
+        self.scheduler = scheduler or get_image_scheduler()
+        # Only touched from the GUI thread: key -> {'future': ..., 'subscribers': [(owner, callback)]}
+        self.pending = {}
+        self.joined = 0
+        self.image_ready.connect(self.on_image_ready)
+
+    def cached(self, path, size, box=None):
+        # Pixmap from the memory tier, or None
+        return self.cache.get_pixmap(thumbnail_key(path, size, box, device_pixel_ratio()))
+
+    def cached_placeholder(self, path):
+        return self.cache.get_placeholder(path)
+
+    def load(self, path, size, callback, owner=None, priority=PRIORITY_VISIBLE, box=None):
+        # box is the (width, height) the image is shown at, the callback then gets a pixmap
+        # fitted into it that can be drawn as is
+        self.request((path, size, box, device_pixel_ratio()), callback, owner, priority)
+
+    def load_placeholder(self, path, callback, owner=None, priority=PRIORITY_VISIBLE):
+        # The callback gets the tiny placeholder, to be drawn scaled up
+        self.request((path, PLACEHOLDER_SIZE, PLACEHOLDER_BOX, 1.0), callback, owner, priority)
+
+    def load_progressive(self, path, size, callback, owner=None, priority=PRIORITY_VISIBLE, box=None):
+        # Unless the image is in memory already, the callback first gets the tiny placeholder
+        # scaled up to the box, which comes out blurred. Scaling from 30x45 is cheap enough for
+        # the GUI thread, and the tiny one stays cached for widgets rebuilt later
+        if size == PLACEHOLDER_SIZE or box is None or self.cached(path, size, box) is not None:
+            self.load(path, size, callback, owner, priority, box)
+            return
+        state = {'image': False, 'placeholder': False}
+
+        def show_placeholder(tiny):
+            if tiny is not None and not state['image']:
+                state['placeholder'] = True
+                callback(scale_placeholder(tiny, box, device_pixel_ratio()))
+
+        def show_image(pixmap):
+            state['image'] = True
+            # A failed download keeps the placeholder rather than showing nothing
+            if pixmap is not None or not state['placeholder']:
+                callback(pixmap)
+
+        # Queued first, so at the same priority placeholders arrive before any full size image
+        self.load_placeholder(path, show_placeholder, owner, priority)
+        self.load(path, size, show_image, owner, priority, box)
+
+    def request(self, key, callback, owner, priority):
+        pixmap = self.lookup(key)
+        if pixmap is not None:
+            callback(pixmap)
+            return
+        entry = self.pending.get(key)
+        if entry:
+            # Same image already on its way, just wait for it
+            entry['subscribers'].append((owner, callback))
+            self.joined += 1
+            return
+        future = self.scheduler.submit(self.download, key, priority=priority)
+        self.pending[key] = {'future': future, 'subscribers': [(owner, callback)]}
+
+    def lookup(self, key):
+        if is_placeholder(key):
+            return self.cache.get_placeholder(key[0])
+        return self.cache.get_pixmap(thumbnail_key(*key))
+
+    def download(self, key):
+        path, size, box, ratio = key
+        image = None
+        try:
+            with tracer.span('image', 'image', path=path, size=size):
+                data = fetch_image_bytes(path, size, self.cache)
+                image = decode_image(data, size, box, ratio) if data else None
+        finally:
+            # Whatever went wrong, the pending entry has to be settled or the image never loads again
+            self.image_ready.emit(key, image)
+
+    def on_image_ready(self, key, image):
+        entry = self.pending.pop(key, None)
+        if entry is None:
+            return
+        pixmap = None
+        if image is not None:
+            # The only part that has to run on the GUI thread. Still done and cached when every
+            # subscriber was cancelled, so the image is not decoded again when it scrolls back in
+            with metrics.timed('image_convert_seconds', size=key[1]):
+                pixmap = QPixmap.fromImage(image)
+            if is_placeholder(key):
+                self.cache.put_placeholder(key[0], pixmap)
+            else:
+                self.cache.put_pixmap(thumbnail_key(*key), pixmap)
+        for owner, callback in entry['subscribers']:
+            try:
+                callback(pixmap)
+            except RuntimeError:
+                pass  # Target label was deleted before the image arrived
+
+    def cancel(self, owner):
+        for key, entry in list(self.pending.items()):
+            entry['subscribers'] = [(o, callback) for o, callback in entry['subscribers'] if o is not owner]
+            if not entry['subscribers'] and entry['future'].cancel():
+                del self.pending[key]
+
+    def shutdown(self):
+        for entry in self.pending.values():
+            entry['future'].cancel()
+        self.pending.clear()
+
+
+image_loader = None
+
+
+def get_image_loader():
+    global image_loader
+    if image_loader is None:
+        image_loader = ImageLoader()
+    return image_loader
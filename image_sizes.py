@@ -0,0 +1,72 @@
+import threading
+
+import requests
+
+from image_loader import device_pixel_ratio
+
+
+# What TMDB's /configuration listed when this was written, used until it has been fetched
+DEFAULT_SIZES = {
+    'poster': ['w92', 'w154', 'w185', 'w342', 'w500', 'w780', 'original'],
+    'profile': ['w45', 'w185', 'h632', 'original'],
+    'backdrop': ['w300', 'w780', 'w1280', 'original'],
+    'still': ['w92', 'w185', 'w300', 'original'],
+}
+# Width over height of each kind of image
+ASPECT_RATIOS = {
+    'poster': 2 / 3,
+    'profile': 2 / 3,
+    'backdrop': 16 / 9,
+    'still': 16 / 9,
+}
+
+
+class ImageSizes:
+    # Picks the smallest TMDB size variant that still covers the box an image is shown in
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sizes = {kind: list(sizes) for kind, sizes in DEFAULT_SIZES.items()}
+        self.loaded = False
+
+    def load(self, client):
+        # Goes through the response cache, so this is a network call about once a week
+        try:
+            data = client.request("configuration")
+        except requests.exceptions.RequestException:
+            return False
+        images = (data or {}).get('images', {})
+        with self.lock:
+            for kind in DEFAULT_SIZES:
+                sizes = images.get(f"{kind}_sizes")
+                if sizes:
+                    self.sizes[kind] = list(sizes)
+            self.loaded = True
+        return True
+
+    def pick(self, kind, box, ratio=None):
+        # box is (width, height) in logical pixels, the image is fitted into it keeping its aspect ratio
+        ratio = ratio or device_pixel_ratio()
+        width, height = box
+        aspect = ASPECT_RATIOS.get(kind, 2 / 3)
+        # Size of the image once fitted into the box, in device pixels
+        shown_width = min(width, height * aspect) * ratio
+        shown_height = shown_width / aspect
+        with self.lock:
+            sizes = self.sizes.get(kind) or DEFAULT_SIZES['poster']
+        for size in sizes:
+            if size[1:].isdigit():
+                covered = int(size[1:]) >= (shown_width if size[0] == 'w' else shown_height)
+                if covered:
+                    return size
+        return sizes[-1]
+
+
+image_sizes = None
+
+
+def get_image_sizes():
+    global image_sizes
+    if image_sizes is None:
+        image_sizes = ImageSizes()
+    return image_sizes
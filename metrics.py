@@ -0,0 +1,163 @@
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from tracing import tracer
+
+
+# Upper bounds in seconds, shared by every histogram so they line up in the diagnostics tab
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PROMETHEUS_PREFIX = 'tmdb_app_'
+
+HELP = {
+    'api_request_seconds': "TMDB API calls, cache lookups, retries and rate limit waits included",
+    'api_parse_seconds': "Decoding TMDB API JSON bodies",
+    'api_response_bytes_total': "Bytes received from the TMDB API",
+    'api_retries_total': "TMDB API requests sent again after a 429 or 5xx",
+    'api_errors_total': "TMDB API calls that raised",
+    'image_request_seconds': "Getting image bytes from the disk cache or image.tmdb.org",
+    'image_response_bytes_total': "Bytes received from image.tmdb.org",
+    'image_errors_total': "Image downloads that failed",
+    'image_decode_seconds': "Decoding image bytes, off the GUI thread where the loader is used",
+    'image_scale_seconds': "Scaling decoded images to their display size, off the GUI thread except for placeholders",
+    'image_convert_seconds': "Turning scaled images into pixmaps on the GUI thread",
+    'widget_build_seconds': "Building or painting result widgets on the GUI thread",
+    'single_flight_calls_total': "Lookups that went out (executed) or joined one already in flight (shared)",
+    'title_index_query_seconds': "Completing typed text from the local title index",
+    'event_loop_lag_seconds': "How late the GUI thread's heartbeat timer fired, time the event loop spent busy",
+    'event_loop_stall_seconds': "GUI thread stalls over the watchdog threshold, by the call chain they were caught in",
+}
+
+
+def endpoint_label(endpoint):
+    # movie/550 and movie/551 are the same endpoint as far as timings go
+    return re.sub(r'/\d+', '/{id}', endpoint.split('?')[0].strip('/'))
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        index = 0
+        while index < len(BUCKETS) and seconds > BUCKETS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        # Upper bound of the bucket the q-th observation falls in, never above the largest one seen
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(BUCKETS[index], self.max) if index < len(BUCKETS) else self.max
+        return self.max
+
+
+class Metrics:
+    # Latency histograms and counters keyed by name and labels, safe to use from any thread
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    @staticmethod
+    def key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name, seconds, **labels):
+        # Every timing also shows up as a span when a trace is being recorded
+        tracer.complete(name.removesuffix('_seconds'), seconds, name.split('_')[0], **labels)
+        key = self.key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, amount=1, **labels):
+        key = self.key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    @contextmanager
+    def timed(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def counter_total(self, name, **labels):
+        # Sum over every label set that contains the given labels
+        with self.lock:
+            return sum(value for (counter, counter_labels), value in self.counters.items()
+                       if counter == name and set(labels.items()) <= set(counter_labels))
+
+    def histogram_rows(self):
+        # (name, labels, count, p50, p95, max, bucket counts), sorted for display
+        with self.lock:
+            return [(name, dict(labels), histogram.count, histogram.quantile(0.5), histogram.quantile(0.95),
+                     histogram.max, list(histogram.buckets))
+                    for (name, labels), histogram in sorted(self.histograms.items())]
+
+    def counter_rows(self):
+        with self.lock:
+            return [(name, dict(labels), value) for (name, labels), value in sorted(self.counters.items())]
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def to_prometheus(self):
+        lines = []
+        typed = set()
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+        for (name, labels), histogram in histograms:
+            full_name = PROMETHEUS_PREFIX + name
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# HELP {full_name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {full_name} histogram")
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), histogram.buckets):
+                cumulative += count
+                lines.append(f"{full_name}_bucket{format_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{full_name}_sum{format_labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{full_name}_count{format_labels(labels)} {histogram.count}")
+        for (name, labels), value in counters:
+            full_name = PROMETHEUS_PREFIX + name
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# HELP {full_name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {full_name} counter")
+            lines.append(f"{full_name}{format_labels(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        with open(path, 'w') as f:
+            f.write(self.to_prometheus())
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+metrics = Metrics()
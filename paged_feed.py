@@ -0,0 +1,150 @@
+import json
+from collections import OrderedDict
+
+import requests
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from tracing import tracer
+
+
+# TMDB list endpoints always return 20 results per page
+TMDB_PAGE_SIZE = 20
+
+
+class DataLoaderThread(QThread):
+    data_loaded = pyqtSignal(dict)
+
+    def __init__(self, client, endpoint, params):
+        super().__init__()
+        self.client = client
+        self.endpoint = endpoint
+        self.params = params
+
+    def run(self):
+        # Abandoned before it got going, e.g. the search it was for has been typed over
+        if self.isInterruptionRequested():
+            return
+        try:
+            with tracer.span('list page', 'feed', endpoint=self.endpoint, page=(self.params or {}).get('page')):
+                data = self.client.request(self.endpoint, self.params)
+            self.data_loaded.emit(data)
+        except requests.exceptions.RequestException as e:
+            self.data_loaded.emit({'error': str(e)})
+
+
+class PagedFeed(QObject):
+    # page number, results of that page
+    page_loaded = pyqtSignal(int, list)
+    page_prefetched = pyqtSignal(int, list)
+    load_failed = pyqtSignal(int, str)
+    loading_changed = pyqtSignal(bool)
+
+    def __init__(self, client, endpoint, params=None, max_cached_pages=20, parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.endpoint = endpoint
+        self.params = params or {}
+        self.max_cached_pages = max_cached_pages
+        # (params key, page) -> (results, total pages), least recently used first
+        self.pages = OrderedDict()
+        self.threads = {}
+        self.next_page = 1
+        self.total_pages = None
+        self.waiting = False
+        self.started = False
+
+    def params_key(self):
+        return json.dumps(self.params, sort_keys=True, default=str)
+
+    def restart(self, params=None, start_page=1, total_pages=None):
+        # Start over from page 1, pages fetched before are replayed from memory. A later
+        # start_page means the list already shows the pages before it from somewhere else,
+        # that page is then only warmed up until scrolling asks for it
+        if params is not None:
+            self.params = params
+            self.cancel_stale()
+        self.started = True
+        self.next_page = start_page
+        self.total_pages = total_pages
+        self.set_waiting(False)
+        if start_page == 1:
+            self.load_more()
+        elif self.has_more() and (self.params_key(), start_page) not in self.pages:
+            self.fetch(start_page)
+
+    def stop(self):
+        # List is being filled from somewhere else, scrolling must not pull in pages
+        self.started = False
+        self.set_waiting(False)
+
+    def cancel_stale(self):
+        # Pages of other params that have not been requested yet never will be, the ones
+        # already on the wire still land in the page cache
+        current = self.params_key()
+        for (params_key, page), thread in self.threads.items():
+            if params_key != current:
+                thread.requestInterruption()
+
+    def has_more(self):
+        return self.total_pages is None or self.next_page <= self.total_pages
+
+    def load_more(self):
+        if not self.started or self.waiting or not self.has_more():
+            return
+        page = self.next_page
+        cached = self.pages.get((self.params_key(), page))
+        if cached is not None:
+            self.show_page(page, cached)
+        else:
+            self.set_waiting(True)
+            self.fetch(page)
+
+    def fetch(self, page):
+        key = (self.params_key(), page)
+        if key in self.threads:
+            return
+        thread = DataLoaderThread(self.client, self.endpoint, {**self.params, 'page': page})
+        thread.data_loaded.connect(lambda data: self.on_page_fetched(key, data))
+        # Keep the thread referenced until it has really stopped running
+        thread.finished.connect(lambda: self.threads.pop(key, None))
+        self.threads[key] = thread
+        thread.start()
+
+    def on_page_fetched(self, key, data):
+        params_key, page = key
+        current = params_key == self.params_key()
+        if 'error' in data:
+            if current and self.waiting and page == self.next_page:
+                self.set_waiting(False)
+                self.load_failed.emit(page, data['error'])
+            return
+
+        entry = (data.get('results', []), data.get('total_pages', 1))
+        self.pages[key] = entry
+        self.pages.move_to_end(key)
+        while len(self.pages) > self.max_cached_pages:
+            self.pages.popitem(last=False)
+
+        if not current:
+            return
+        if self.waiting and page == self.next_page:
+            self.show_page(page, entry)
+        elif page >= self.next_page:
+            self.page_prefetched.emit(page, entry[0])
+
+    def show_page(self, page, entry):
+        results, total_pages = entry
+        self.pages.move_to_end((self.params_key(), page))
+        self.total_pages = total_pages
+        self.next_page = page + 1
+        self.set_waiting(False)
+        self.page_loaded.emit(page, results)
+
+        # Warm up the page after this one while the user is still looking at this one
+        if self.has_more() and (self.params_key(), self.next_page) not in self.pages:
+            self.fetch(self.next_page)
+
+    def set_waiting(self, waiting):
+        if self.waiting != waiting:
+            self.waiting = waiting
+            self.loading_changed.emit(waiting)
@@ -0,0 +1,179 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+from tracing import tracer
+
+
+# Lower numbers run first
+PRIORITY_VISIBLE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_PREFETCH = 2
+PRIORITY_BACKGROUND = 3
+# Image downloads get workers of their own, so API calls held back by the rate limit never
+# keep posters from loading
+IMAGE_WORKERS = 6
+
+PRIORITY_NAMES = {
+    PRIORITY_VISIBLE: 'visible',
+    PRIORITY_NORMAL: 'normal',
+    PRIORITY_PREFETCH: 'prefetch',
+    PRIORITY_BACKGROUND: 'background',
+}
+
+
+class TokenBucket:
+    def __init__(self, rate=40, capacity=20):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        # Tokens refill from here on, in the future while a pause asked for by the server lasts
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def acquire(self):
+        # Tokens are reserved up front and may go negative, callers then sleep off
+        # their debt, which hands out tokens in arrival order
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.rate)
+            self.updated = max(self.updated, now)
+            self.tokens -= 1
+            wait = self.updated - now + (-self.tokens / self.rate if self.tokens < 0 else 0.0)
+            self.acquired += 1
+            if wait > 0:
+                self.throttled += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        # Server said slow down: nobody gets a token until the pause is over. Pauses reported
+        # by several requests at once overlap rather than add up
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.rate)
+            self.tokens = min(self.tokens, 0)
+            self.updated = max(self.updated, now + seconds)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'acquired': self.acquired,
+                'throttled': self.throttled,
+                'total_wait': self.total_wait,
+                'max_wait': self.max_wait,
+            }
+
+
+class RequestScheduler:
+    def __init__(self, max_workers=8):
+        self.condition = threading.Condition()
+        self.queue = []
+        self.sequence = itertools.count()
+        self.workers = []
+        self.target_workers = 0
+        self.running = True
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.set_max_workers(max_workers)
+
+    def set_max_workers(self, max_workers):
+        with self.condition:
+            self.target_workers = max(1, int(max_workers))
+            self.workers = [worker for worker in self.workers if worker.is_alive()]
+            while len(self.workers) < self.target_workers:
+                worker = threading.Thread(target=self.work, name=f"scheduler-{len(self.workers)}", daemon=True)
+                self.workers.append(worker)
+                worker.start()
+            # Surplus workers notice the lower target and exit after their current job
+            self.condition.notify_all()
+
+    def submit(self, fn, *args, priority=PRIORITY_NORMAL):
+        future = Future()
+        with self.condition:
+            if not self.running:
+                future.cancel()
+                return future
+            heapq.heappush(self.queue, (priority, next(self.sequence), time.monotonic(), future, fn, args))
+            self.submitted += 1
+            self.condition.notify()
+        return future
+
+    def work(self):
+        while True:
+            with self.condition:
+                while self.running and not self.queue and len(self.workers) <= self.target_workers:
+                    self.condition.wait()
+                if not self.running or len(self.workers) > self.target_workers:
+                    self.workers.remove(threading.current_thread())
+                    return
+                priority, _, enqueued_at, future, fn, args = heapq.heappop(self.queue)
+            if not future.set_running_or_notify_cancel():
+                continue
+            wait = time.monotonic() - enqueued_at
+            tracer.complete('queued', wait, 'scheduler', priority=PRIORITY_NAMES.get(priority, priority))
+            with self.condition:
+                self.started += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            with self.condition:
+                self.completed += 1
+
+    def stats(self):
+        with self.condition:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, _, future, _, _ in self.queue:
+                if not future.cancelled():
+                    depth[PRIORITY_NAMES.get(priority, str(priority))] += 1
+            return {
+                'workers': self.target_workers,
+                'queued': sum(depth.values()),
+                'queued_by_priority': depth,
+                'running': self.started - self.completed,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'average_wait': self.total_wait / self.started if self.started else 0.0,
+                'max_wait': self.max_wait,
+            }
+
+    def shutdown(self):
+        with self.condition:
+            self.running = False
+            for _, _, _, future, _, _ in self.queue:
+                future.cancel()
+            self.queue = []
+            self.condition.notify_all()
+
+
+request_scheduler = None
+image_scheduler = None
+
+
+def get_request_scheduler():
+    global request_scheduler
+    if request_scheduler is None:
+        request_scheduler = RequestScheduler()
+    return request_scheduler
+
+
+def get_image_scheduler():
+    global image_scheduler
+    if image_scheduler is None:
+        image_scheduler = RequestScheduler(IMAGE_WORKERS)
+    return image_scheduler
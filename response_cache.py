@@ -0,0 +1,124 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_CACHE_PATH = 'tmdb_cache.sqlite3'
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_TTL = 10 * 60
+
+# Time-to-live per endpoint, first matching pattern wins
+DEFAULT_TTL_RULES = [
+    (r'^(movie|tv)/\d+/(credits|external_ids)$', 7 * 24 * 3600),
+    (r'^(movie|tv)/\d+/videos$', 24 * 3600),
+    (r'^(movie|tv)/\d+$', 24 * 3600),
+    (r'^movie/now_playing$', 15 * 60),
+    (r'^(movie/top_rated|tv/popular|tv/airing_today)$', 60 * 60),
+    (r'^search/', 60 * 60),
+    (r'^account', 60),
+    (r'^configuration$', 7 * 24 * 3600),
+]
+# Answers that depend on whose token asked, so they are never shared between accounts
+PER_USER_ENDPOINTS = re.compile(r'^account')
+
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, ttl_rules=None, default_ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttl_rules = [(re.compile(pattern), ttl) for pattern, ttl in (ttl_rules or DEFAULT_TTL_RULES)]
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(endpoint, params=None, token=''):
+        # requests drops None-valued params, so they must not split the key either
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        key = f"{endpoint}?{json.dumps(params, sort_keys=True, default=str)}"
+        if PER_USER_ENDPOINTS.search(endpoint):
+            # Only a hash of the token goes into the file
+            key = f"{hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]}:{key}"
+        return key
+
+    def ttl_for(self, endpoint):
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(endpoint):
+                return ttl
+        return self.default_ttl
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+        body, etag, last_modified, expires_at = row
+        return {
+            'body': body,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': expires_at > time.time(),
+        }
+
+    def put(self, key, endpoint, body, etag=None, last_modified=None):
+        now = time.time()
+        size = len(body.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, body, etag, last_modified, now + self.ttl_for(endpoint), now, size)
+            )
+            self.evict()
+            self.conn.commit()
+
+    def refresh(self, key, endpoint):
+        # The server answered 304 Not Modified, so the stored body is good for another TTL
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?",
+                (now + self.ttl_for(endpoint), now, key)
+            )
+            self.conn.commit()
+
+    def evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC")
+        stale_keys = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
@@ -0,0 +1,263 @@
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRect, pyqtSignal
+from PyQt6.QtGui import QAction, QFont, QPainter
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QMenu
+
+from image_loader import get_image_loader
+from image_sizes import get_image_sizes
+from metrics import metrics
+
+
+POSTER_WIDTH = 200
+POSTER_HEIGHT = 300
+ROW_MARGIN = 5
+ROW_HEIGHT = POSTER_HEIGHT + 2 * ROW_MARGIN
+POSTER_BOX = (POSTER_WIDTH, POSTER_HEIGHT)
+
+# Position of the row in the list it was requested for, keeps streamed rows in order
+PositionRole = Qt.ItemDataRole.UserRole + 1
+
+
+class ResultListModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.items = []
+        self.positions = []
+        # Poster paths that were requested or failed, so painting never asks twice. A poster
+        # is missing once both the full image and its placeholder failed
+        self.requested_posters = set()
+        self.failed_posters = set()
+        self.failed_placeholders = set()
+        # poster path -> rows showing it, so an arriving poster repaints only those. Rebuilt
+        # lazily after a row was inserted in the middle and shifted the ones below
+        self.poster_rows = {}
+        self.poster_rows_stale = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.items):
+            return None
+        item = self.items[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return item.get('title') or item.get('name', 'No Title')
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return item.get('overview')
+        if role == Qt.ItemDataRole.UserRole:
+            return item
+        if role == PositionRole:
+            return self.positions[index.row()]
+        return None
+
+    def add_item(self, item, position=None):
+        if position is None:
+            position = self.positions[-1] + 1 if self.positions else 0
+        row = len(self.items)
+        while row > 0 and self.positions[row - 1] > position:
+            row -= 1
+        if row > 0 and self.positions[row - 1] == position:
+            # Hydrated details replace the summary row shown so far
+            self.forget_poster_row(self.items[row - 1], row - 1)
+            self.items[row - 1] = item
+            self.remember_poster_row(item, row - 1)
+            index = self.index(row - 1)
+            self.dataChanged.emit(index, index)
+            return
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.items.insert(row, item)
+        self.positions.insert(row, position)
+        if row == len(self.items) - 1:
+            self.remember_poster_row(item, row)
+        else:
+            self.poster_rows_stale = True
+        self.endInsertRows()
+
+    def set_items(self, items, positions=None):
+        # Whole list in one reset, much cheaper than a row insert per item for long lists
+        self.beginResetModel()
+        self.items = list(items)
+        self.positions = list(positions) if positions is not None else list(range(len(self.items)))
+        self.rebuild_poster_rows()
+        self.endResetModel()
+
+    def clear(self):
+        get_image_loader().cancel(self)
+        self.beginResetModel()
+        self.items = []
+        self.positions = []
+        self.requested_posters.clear()
+        self.failed_posters.clear()
+        self.failed_placeholders.clear()
+        self.poster_rows = {}
+        self.poster_rows_stale = False
+        self.endResetModel()
+
+    def remember_poster_row(self, item, row):
+        path = item.get('poster_path')
+        if path:
+            self.poster_rows.setdefault(path, set()).add(row)
+
+    def forget_poster_row(self, item, row):
+        rows = self.poster_rows.get(item.get('poster_path'))
+        if rows:
+            rows.discard(row)
+
+    def rebuild_poster_rows(self):
+        self.poster_rows = {}
+        self.poster_rows_stale = False
+        for row, item in enumerate(self.items):
+            self.remember_poster_row(item, row)
+
+    def poster(self, index):
+        path = self.items[index.row()].get('poster_path')
+        if not path or (path in self.failed_posters and path in self.failed_placeholders):
+            return None
+        loader = get_image_loader()
+        size = get_image_sizes().pick('poster', POSTER_BOX)
+        pixmap = loader.cached(path, size, POSTER_BOX)
+        if pixmap is not None:
+            return pixmap
+        if path not in self.requested_posters and path not in self.failed_posters:
+            # Only rows that actually get painted ever request their poster, the tiny
+            # placeholder is asked for first so the row has something to show early
+            self.requested_posters.add(path)
+            loader.load_placeholder(path, lambda tiny: self.on_placeholder_loaded(path, tiny), owner=self)
+            loader.load(path, size, lambda pixmap: self.on_poster_loaded(path, pixmap), owner=self, box=POSTER_BOX)
+        return loader.cached_placeholder(path)
+
+    def on_poster_loaded(self, path, pixmap):
+        self.requested_posters.discard(path)
+        if pixmap is None:
+            # Not asked for again, a placeholder still on its way is shown instead
+            self.failed_posters.add(path)
+        self.repaint_poster(path)
+
+    def on_placeholder_loaded(self, path, tiny):
+        if tiny is None:
+            self.failed_placeholders.add(path)
+        self.repaint_poster(path)
+
+    def repaint_poster(self, path):
+        if self.poster_rows_stale:
+            self.rebuild_poster_rows()
+        for row in sorted(self.poster_rows.get(path, ())):
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+
+class ResultItemDelegate(QStyledItemDelegate):
+    def sizeHint(self, option, index):
+        return QSize(400, ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        item = index.data(Qt.ItemDataRole.UserRole)
+        if item is None:
+            return
+        with metrics.timed('widget_build_seconds', widget='ResultItemDelegate'):
+            self.paint_item(painter, option, index, item)
+
+    def paint_item(self, painter, option, index, item):
+        painter.save()
+        painter.setClipRect(option.rect)
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+
+        # Poster Image
+        rect = option.rect
+        poster_rect = QRect(rect.x() + ROW_MARGIN, rect.y() + ROW_MARGIN, POSTER_WIDTH, POSTER_HEIGHT)
+        pixmap = index.model().poster(index)
+        if pixmap:
+            # Posters come scaled to the box already, placeholders are scaled up here and come out blurred
+            size = pixmap.deviceIndependentSize().toSize().scaled(poster_rect.size(), Qt.AspectRatioMode.KeepAspectRatio)
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            painter.drawPixmap(QRect(poster_rect.topLeft(), size), pixmap)
+        else:
+            placeholder = "Loading..." if item.get('poster_path') in index.model().requested_posters else "No Image"
+            painter.drawText(poster_rect, Qt.AlignmentFlag.AlignCenter, placeholder)
+
+        # Title
+        text_left = poster_rect.right() + 3 * ROW_MARGIN
+        text_width = rect.right() - text_left - ROW_MARGIN
+        title = item.get('title') or item.get('name', 'No Title')
+        title_font = QFont(option.font)
+        title_font.setBold(True)
+        if option.font.pointSizeF() > 0:
+            title_font.setPointSizeF(option.font.pointSizeF() * 1.3)
+        painter.setFont(title_font)
+        title_height = painter.fontMetrics().height()
+        title_rect = QRect(text_left, poster_rect.y(), text_width, title_height)
+        painter.drawText(title_rect, Qt.AlignmentFlag.AlignLeft,
+                         painter.fontMetrics().elidedText(title, Qt.TextElideMode.ElideRight, text_width))
+
+        # Movie Information
+        painter.setFont(option.font)
+        line_height = painter.fontMetrics().height()
+        release_date = item.get('release_date') or item.get('first_air_date')
+        release_year = release_date.split('-')[0] if release_date else 'Unknown'
+        info_lines = [f"Year: {release_year}"]
+        if 'cast' not in item:
+            # Still a list summary, details are on their way
+            info_lines.append(f"Rating: {item.get('vote_average', 'N/A')}/10")
+            info_lines.append("Loading details...")
+        else:
+            if 'title' in item:
+                info_lines.append(f"Runtime: {item.get('runtime', 'N/A')} min")
+            info_lines.append(f"Rating: {item.get('vote_average', 'N/A')}/10")
+            info_lines.append("Genres: " + ', '.join([genre['name'] for genre in item.get('genres', [])]))
+            info_lines.append("Languages: " + ', '.join([lang['english_name'] for lang in item.get('spoken_languages', [])]))
+            cast_names = [member.get('name', 'Unknown') for member in item['cast'][:5]]
+            info_lines.append("Cast: " + (', '.join(cast_names) if cast_names else "No cast information available."))
+
+        y = title_rect.bottom() + ROW_MARGIN
+        for line in info_lines:
+            painter.drawText(QRect(text_left, y, text_width, line_height), Qt.AlignmentFlag.AlignLeft,
+                             painter.fontMetrics().elidedText(line, Qt.TextElideMode.ElideRight, text_width))
+            y += line_height
+
+        # Overview
+        overview_rect = QRect(text_left, y + ROW_MARGIN, text_width, poster_rect.bottom() - y - ROW_MARGIN)
+        painter.setClipRect(overview_rect)
+        painter.drawText(overview_rect, Qt.AlignmentFlag.AlignLeft | Qt.TextFlag.TextWordWrap,
+                         item.get('overview') or 'No overview available.')
+        painter.restore()
+
+
+class ResultListView(QListView):
+    # Scrolled to within a couple of rows of the end
+    near_end = pyqtSignal()
+
+    def __init__(self, parent=None, item_clicked_callback=None):
+        super().__init__(parent)
+        self.item_clicked_callback = item_clicked_callback
+        self.setModel(ResultListModel(self))
+        self.setItemDelegate(ResultItemDelegate(self))
+        self.setUniformItemSizes(True)
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.show_context_menu)
+        self.doubleClicked.connect(lambda index: self.item_clicked_callback(index, 'details'))
+        self.verticalScrollBar().valueChanged.connect(self.check_near_end)
+        self.verticalScrollBar().rangeChanged.connect(self.check_near_end)
+
+    def check_near_end(self, *args):
+        scroll_bar = self.verticalScrollBar()
+        if scroll_bar.maximum() - scroll_bar.value() <= 2 * ROW_HEIGHT:
+            self.near_end.emit()
+
+    def count(self):
+        return self.model().rowCount()
+
+    def show_context_menu(self, position):
+        index = self.indexAt(position)
+        if index.isValid():
+            menu = QMenu(self)
+            details_action = QAction("Show Details", self)
+            play_action = QAction("Play in Embedded Player", self)
+            open_browser_action = QAction("Open in Browser", self)
+            details_action.triggered.connect(lambda: self.item_clicked_callback(index, 'details'))
+            play_action.triggered.connect(lambda: self.item_clicked_callback(index, 'embedded'))
+            open_browser_action.triggered.connect(lambda: self.item_clicked_callback(index, 'browser'))
+            menu.addAction(details_action)
+            menu.addAction(play_action)
+            menu.addAction(open_browser_action)
+            menu.exec(self.mapToGlobal(position))
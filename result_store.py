@@ -0,0 +1,123 @@
+import numpy as np
+
+
+# TMDB's movie and TV genres, so typed names work before any details with genre names arrived
+GENRE_NAMES = {
+    28: 'Action', 12: 'Adventure', 16: 'Animation', 35: 'Comedy', 80: 'Crime', 99: 'Documentary',
+    18: 'Drama', 10751: 'Family', 14: 'Fantasy', 36: 'History', 27: 'Horror', 10402: 'Music',
+    9648: 'Mystery', 10749: 'Romance', 878: 'Science Fiction', 10770: 'TV Movie', 53: 'Thriller',
+    10752: 'War', 37: 'Western', 10759: 'Action & Adventure', 10762: 'Kids', 10763: 'News',
+    10764: 'Reality', 10765: 'Sci-Fi & Fantasy', 10766: 'Soap', 10767: 'Talk', 10768: 'War & Politics',
+}
+# One bit per genre id in a uint64 mask
+MAX_GENRES = 64
+COLUMNS = {
+    'position': np.int32,
+    'id': np.int32,
+    'year': np.int16,
+    'rating': np.float32,
+    'runtime': np.int16,
+    'popularity': np.float32,
+    'genres': np.uint64,
+}
+
+
+def release_year(item):
+    date = item.get('release_date') or item.get('first_air_date') or ''
+    return int(date[:4]) if date[:4].isdigit() else 0
+
+
+def runtime_of(item):
+    # Movies have a runtime, shows a list of episode run times; 0 until details arrived
+    runtime = item.get('runtime') or (item.get('episode_run_time') or [0])[0]
+    return int(runtime or 0)
+
+
+class ResultStore:
+    # Loaded results of a list as numpy columns, filtered and sorted without asking TMDB.
+    # Rows are kept by list position, details overwrite the summary seen before them.
+    # Unknown year and runtime are 0, never match a filter on them and sort last
+
+    def __init__(self, capacity=256):
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self.items = []
+        self.rows = {}
+        self.genre_bits = {}
+        self.genre_ids = {name.lower(): genre_id for genre_id, name in GENRE_NAMES.items()}
+
+    def __len__(self):
+        return len(self.items)
+
+    def clear(self):
+        self.items = []
+        self.rows = {}
+
+    def genre_mask(self, genre_ids):
+        mask = 0
+        for genre_id in genre_ids:
+            bit = self.genre_bits.get(genre_id)
+            if bit is None:
+                if len(self.genre_bits) >= MAX_GENRES:
+                    continue
+                bit = self.genre_bits[genre_id] = len(self.genre_bits)
+            mask |= 1 << bit
+        return mask
+
+    def put(self, position, item):
+        row = self.rows.get(position)
+        if row is None:
+            row = self.rows[position] = len(self.items)
+            self.items.append(item)
+            if row >= len(self.columns['id']):
+                for name, column in self.columns.items():
+                    self.columns[name] = np.concatenate([column, np.zeros_like(column)])
+        else:
+            self.items[row] = item
+        genres = item.get('genres')
+        if genres:
+            self.genre_ids.update((genre['name'].lower(), genre['id']) for genre in genres if genre.get('name'))
+        values = {
+            'position': position,
+            'id': item.get('id', 0),
+            'year': release_year(item),
+            'rating': item.get('vote_average') or 0,
+            'runtime': runtime_of(item),
+            'popularity': item.get('popularity') or 0,
+            'genres': self.genre_mask(item.get('genre_ids') or [genre['id'] for genre in genres or []]),
+        }
+        for name, value in values.items():
+            self.columns[name][row] = value
+
+    def genre_id(self, genre):
+        # A TMDB genre id ("18") or name ("drama"), None when neither is known
+        genre = str(genre).strip().lower()
+        if genre.isdigit():
+            return int(genre)
+        return self.genre_ids.get(genre)
+
+    def query(self, year=None, genre=None, min_rating=None, max_runtime=None, sort_key='position',
+              descending=False):
+        # (positions, items) passing every given filter, in sort order, ties kept in list order
+        count = len(self.items)
+        column = {name: values[:count] for name, values in self.columns.items()}
+        keep = np.ones(count, dtype=bool)
+        if year:
+            keep &= column['year'] == int(year)
+        if genre:
+            genre_id = self.genre_id(genre)
+            bit = self.genre_bits.get(genre_id)
+            if bit is None:
+                return [], []
+            keep &= (column['genres'] & np.uint64(1 << bit)) != 0
+        if min_rating is not None:
+            keep &= column['rating'] >= min_rating
+        if max_runtime is not None:
+            keep &= (column['runtime'] > 0) & (column['runtime'] <= max_runtime)
+        rows = np.flatnonzero(keep)
+        values = column[sort_key][rows].astype(np.float64)
+        if sort_key in ('year', 'runtime'):
+            values[values == 0] = -np.inf if descending else np.inf
+        # Positions as a second key keep the order stable and do not flip when descending
+        order = np.lexsort((column['position'][rows], -values if descending else values))
+        rows = rows[order]
+        return column['position'][rows].tolist(), [self.items[row] for row in rows]
@@ -0,0 +1,60 @@
+import threading
+
+from metrics import metrics
+
+
+class Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, name='calls'):
+        # name labels the exported counters, e.g. details or images
+        self.name = name
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args):
+        # Callers asking for a key that is already being fetched wait for that fetch
+        # and get the same result (or exception) instead of starting their own
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = Call()
+                self.calls[key] = call
+                self.executed += 1
+            else:
+                self.shared += 1
+        metrics.increment('single_flight_calls_total', flight=self.name, outcome='executed' if leader else 'shared')
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        with self.lock:
+            requested = self.executed + self.shared
+            return {
+                'executed': self.executed,
+                'shared': self.shared,
+                'in_flight': len(self.calls),
+                'suppression_rate': self.shared / requested if requested else 0.0,
+            }
@@ -0,0 +1,133 @@
+import os
+import sys
+import threading
+import time
+import traceback
+
+from PyQt6.QtCore import QObject, QTimer, QCoreApplication
+
+from metrics import metrics
+
+
+HEARTBEAT_MS = 50
+# GUI thread blocked for longer than this counts as a stall
+STALL_THRESHOLD = 0.2
+SAMPLE_INTERVAL = 0.05
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def call_chain(frame):
+    # Functions of this app on the stack, outermost first: "on_search_data_loaded → on_detail_loaded"
+    stack = traceback.extract_stack(frame)
+    own = [entry for entry in stack if os.path.dirname(os.path.abspath(entry.filename)) == SOURCE_DIR]
+    names = [entry.name for entry in (own or stack[-3:])]
+    # Whatever Qt or the library below was doing when it was caught
+    if own and stack[-1] is not own[-1]:
+        names.append(f"[{stack[-1].name}]")
+    return ' → '.join(names)
+
+
+class StallWatchdog(QObject):
+    # Measures event loop latency and captures the GUI thread's stack while it is blocked
+
+    def __init__(self, threshold=STALL_THRESHOLD, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold
+        self.report_enabled = '--stall-report' in sys.argv
+        self.lock = threading.Lock()
+        self.gui_thread_id = threading.get_ident()
+        self.last_beat = time.perf_counter()
+        self.running = False
+        self.stalls = 0
+        # call chain -> {'count', 'total', 'worst', 'stack'}
+        self.offenders = {}
+        self.timer = QTimer(self)
+        self.timer.setInterval(HEARTBEAT_MS)
+        self.timer.timeout.connect(self.beat)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.last_beat = time.perf_counter()
+        self.timer.start()
+        threading.Thread(target=self.watch, name='stall-watchdog', daemon=True).start()
+        QCoreApplication.instance().aboutToQuit.connect(self.stop)
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.timer.stop()
+        if self.report_enabled:
+            self.print_report()
+
+    def beat(self):
+        now = time.perf_counter()
+        lag = now - self.last_beat - HEARTBEAT_MS / 1000
+        self.last_beat = now
+        metrics.observe('event_loop_lag_seconds', max(0.0, lag))
+
+    def watch(self):
+        # Runs on its own thread, so it keeps going while the GUI thread is stuck
+        samples = {}
+        stacks = {}
+        stall_beat = None
+        while self.running:
+            time.sleep(SAMPLE_INTERVAL)
+            beat = self.last_beat
+            if time.perf_counter() - beat > self.threshold:
+                frame = sys._current_frames().get(self.gui_thread_id)
+                if frame is not None:
+                    chain = call_chain(frame)
+                    samples[chain] = samples.get(chain, 0) + 1
+                    stacks.setdefault(chain, ''.join(traceback.format_stack(frame)))
+                    del frame
+                stall_beat = beat
+            elif stall_beat is not None:
+                self.record(beat - stall_beat - HEARTBEAT_MS / 1000, samples, stacks)
+                samples, stacks, stall_beat = {}, {}, None
+
+    def record(self, duration, samples, stacks):
+        if not samples:
+            return
+        # The whole stall goes to the stack it was caught in most often
+        chain = max(samples, key=samples.get)
+        metrics.observe('event_loop_stall_seconds', duration, stack=chain)
+        with self.lock:
+            self.stalls += 1
+            offender = self.offenders.setdefault(chain, {'count': 0, 'total': 0.0, 'worst': 0.0, 'stack': ''})
+            offender['count'] += 1
+            offender['total'] += duration
+            if duration >= offender['worst']:
+                offender['worst'] = duration
+                offender['stack'] = stacks[chain]
+
+    def worst_offenders(self, limit=10):
+        # (call chain, stalls, total seconds, worst seconds, stack of the worst one), most blocked time first
+        with self.lock:
+            offenders = sorted(self.offenders.items(), key=lambda item: item[1]['total'], reverse=True)
+            return [(chain, offender['count'], offender['total'], offender['worst'], offender['stack'])
+                    for chain, offender in offenders[:limit]]
+
+    def reset(self):
+        with self.lock:
+            self.stalls = 0
+            self.offenders.clear()
+
+    def print_report(self):
+        lines = [f"GUI stalls over {self.threshold * 1000:.0f} ms: {self.stalls}"]
+        for chain, count, total, worst, _ in self.worst_offenders():
+            lines.append(f"  {total * 1000:8.0f} ms total, {count:3d}x, worst {worst * 1000:6.0f} ms  {chain}")
+        print('\n'.join(lines), file=sys.stderr)
+
+
+stall_watchdog = None
+
+
+def get_stall_watchdog():
+    # Has to be first called on the GUI thread, that is the thread it watches
+    global stall_watchdog
+    if stall_watchdog is None:
+        stall_watchdog = StallWatchdog()
+    return stall_watchdog
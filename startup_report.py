@@ -0,0 +1,50 @@
+import sys
+import time
+
+from PyQt6.QtCore import QObject, QEvent, QTimer
+
+
+class StartupReport(QObject):
+    # Imported first by the entry points, so the clock starts before the heavy imports
+    def __init__(self):
+        super().__init__()
+        self.enabled = '--startup-report' in sys.argv
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.phases = []
+        self.window = None
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def watch_first_paint(self, window):
+        if not self.enabled:
+            return
+        self.window = window
+        window.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if watched is self.window and event.type() == QEvent.Type.Paint:
+            watched.removeEventFilter(self)
+            self.window = None
+            # Measured once the paint event has been handled
+            QTimer.singleShot(0, self.on_first_paint)
+        return False
+
+    def on_first_paint(self):
+        self.mark("first paint")
+        self.print_report()
+
+    def print_report(self):
+        lines = ["Startup report:"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:<14} {seconds * 1000:8.1f} ms")
+        lines.append(f"  {'total':<14} {(self.last - self.started) * 1000:8.1f} ms")
+        web_engine = 'loaded' if 'PyQt6.QtWebEngineWidgets' in sys.modules else 'not loaded'
+        lines.append(f"  QtWebEngine {web_engine}")
+        print('\n'.join(lines), file=sys.stderr)
+
+
+startup_report = StartupReport()
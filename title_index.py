@@ -0,0 +1,307 @@
+import json
+import os
+import re
+import unicodedata
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from metrics import metrics
+from request_scheduler import PRIORITY_BACKGROUND, get_request_scheduler
+
+
+DEFAULT_INDEX_DIR = 'title_index'
+MEDIA_TYPES = ('movie', 'tv')
+# Titles added since the last merge are kept in plain dicts, past this many a merge starts
+MAX_PENDING = 5_000
+# Share of the typed trigrams a title has to contain, low enough for a typo per word
+MIN_SIMILARITY = 0.5
+ARRAYS = ('keys', 'offsets', 'postings', 'ids', 'id_order', 'popularity', 'gram_counts', 'title_offsets', 'title_bytes')
+
+
+def normalize(text):
+    # "Amélie!" -> "amelie", accents and punctuation never decide whether a title matches
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.findall(r'\w+', text.lower()))
+
+
+def trigrams(text, partial=False):
+    # Per word, padded like pg_trgm: "star" -> "  s", " st", "sta", "tar", "ar "; with partial
+    # the last word may still be half typed, so nothing is assumed about its end
+    words = normalize(text).split()
+    grams = set()
+    for position, word in enumerate(words):
+        padded = f"  {word}" if partial and position == len(words) - 1 else f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def gram_key(gram):
+    return (ord(gram[0]) << 42) | (ord(gram[1]) << 21) | ord(gram[2])
+
+
+def title_id(media_type, tmdb_id):
+    return (MEDIA_TYPES.index(media_type) << 32) | int(tmdb_id)
+
+
+def array_path(path, name, generation):
+    return os.path.join(path, f"{name}-{generation}.npy")
+
+
+def open_generation(path, generation):
+    return {name: np.load(array_path(path, name, generation), mmap_mode='r') for name in ARRAYS}
+
+
+class TitleIndex(QObject):
+    # Trigram index over every title seen, for typo tolerant completion without a round trip.
+    # Merged titles are memory-mapped numpy arrays, trigram postings in CSR form; newer ones
+    # stay in dicts until a merge on a worker takes them in
+
+    # generation written (0 when the merge failed), number of pending titles it took in
+    merge_finished = pyqtSignal(int, int)
+
+    def __init__(self, path=DEFAULT_INDEX_DIR, scheduler=None, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.scheduler = scheduler or get_request_scheduler()
+        self.generation = 0
+        self.base = None
+        self.base_count = 0
+        self.merging = False
+        self.clear_pending()
+        self.merge_finished.connect(self.on_merge_finished)
+        self.load()
+
+    def load(self):
+        manifest = os.path.join(self.path, 'manifest.json')
+        if os.path.exists(manifest):
+            try:
+                with open(manifest) as f:
+                    generation = json.load(f)['generation']
+                self.use_generation(generation, open_generation(self.path, generation))
+            except (OSError, ValueError, KeyError):
+                pass
+        # Titles that were not merged yet when the app last closed
+        try:
+            with open(os.path.join(self.path, 'pending.json')) as f:
+                pending = json.load(f)
+        except (OSError, ValueError):
+            pending = []
+        for key, title, popularity in pending:
+            if not self.contains(key):
+                self.add_entry(key, title, popularity)
+
+    def use_generation(self, generation, base):
+        self.generation = generation
+        self.base = base
+        self.base_count = len(base['ids'])
+
+    def clear_pending(self):
+        # Titles not merged yet: gram -> [entry number], entries numbered on after the merged ones
+        self.pending_grams = {}
+        self.pending_ids = []
+        self.pending_titles = []
+        self.pending_popularity = []
+        self.pending_gram_counts = []
+        self.pending_lookup = {}
+
+    def __len__(self):
+        return self.base_count + len(self.pending_ids)
+
+    def contains(self, key):
+        if key in self.pending_lookup:
+            return True
+        if not self.base_count:
+            return False
+        ids, order = self.base['ids'], self.base['id_order']
+        position = np.searchsorted(ids, key, sorter=order)
+        return position < self.base_count and ids[order[position]] == key
+
+    def add(self, media_type, item):
+        # Any TMDB result or details dict, titles already in the index are skipped
+        title = item.get('title') or item.get('name')
+        if not title or 'id' not in item or media_type not in MEDIA_TYPES:
+            return
+        key = title_id(media_type, item['id'])
+        if not self.contains(key):
+            self.add_entry(key, title, float(item.get('popularity') or 0))
+
+    def add_entry(self, key, title, popularity):
+        entry = len(self)
+        self.pending_lookup[key] = entry
+        self.pending_ids.append(key)
+        self.pending_titles.append(title)
+        self.pending_popularity.append(popularity)
+        grams = trigrams(title)
+        self.pending_gram_counts.append(len(grams))
+        for gram in grams:
+            self.pending_grams.setdefault(gram, []).append(entry)
+        if len(self.pending_ids) >= MAX_PENDING:
+            self.start_merge()
+
+    def add_many(self, media_type, items):
+        for item in items:
+            self.add(media_type, item)
+
+    def complete(self, text, limit=10, media_type=None):
+        # Distinct titles best matching what has been typed so far. Ranked by trigrams in common,
+        # then by how much of the title that covers, so "star wa" puts Star Wars above longer
+        # titles that also contain both words, then by popularity
+        with metrics.timed('title_index_query_seconds'):
+            return self.query(text, limit, media_type)
+
+    def query(self, text, limit, media_type):
+        grams = trigrams(text, partial=not text.endswith(' '))
+        if not grams or not len(self):
+            return []
+        hits = [np.asarray(self.pending_grams.get(gram, ()), dtype=np.int64) for gram in grams]
+        if self.base_count:
+            keys = self.base['keys']
+            wanted = np.array([gram_key(gram) for gram in grams], dtype=np.int64)
+            positions = np.searchsorted(keys, wanted)
+            for gram, position in zip(wanted, positions):
+                if position < len(keys) and keys[position] == gram:
+                    start, end = self.base['offsets'][position:position + 2]
+                    hits.append(self.base['postings'][start:end])
+        counts = np.bincount(np.concatenate(hits), minlength=len(self)) if hits else np.zeros(len(self))
+        candidates = np.flatnonzero(counts >= max(1, int(np.ceil(len(grams) * MIN_SIMILARITY))))
+        if media_type is not None:
+            kind = MEDIA_TYPES.index(media_type)
+            candidates = candidates[(self.column('ids', self.pending_ids, np.int64, candidates) >> 32) == kind]
+        if not len(candidates):
+            return []
+        # Both tie breakers together stay below 1, one more trigram in common always wins
+        matched = counts[candidates]
+        popularity = self.column('popularity', self.pending_popularity, np.float32, candidates)
+        coverage = matched / np.maximum(self.column('gram_counts', self.pending_gram_counts, np.int64, candidates), 1)
+        score = matched + 0.9 * coverage + 0.09 * popularity / (popularity.max() + 1)
+        # Extra room for titles several entries share, e.g. remakes
+        top = min(len(candidates), limit * 3)
+        picks = np.argpartition(-score, top - 1)[:top] if top < len(candidates) else np.arange(top)
+        best = candidates[picks[np.argsort(-score[picks], kind='stable')]]
+        titles = list(dict.fromkeys(self.title_of(entry) for entry in best))
+        return titles[:limit]
+
+    def column(self, name, pending, dtype, entries):
+        # Values of a per title array for entry numbers, saved and pending ones alike
+        in_base = entries < self.base_count
+        result = np.empty(len(entries), dtype=dtype)
+        if self.base_count:
+            result[in_base] = self.base[name][entries[in_base]]
+        result[~in_base] = np.asarray(pending, dtype=dtype)[entries[~in_base] - self.base_count]
+        return result
+
+    def title_of(self, entry):
+        if entry >= self.base_count:
+            return self.pending_titles[entry - self.base_count]
+        start, end = self.base['title_offsets'][entry:entry + 2]
+        return bytes(self.base['title_bytes'][start:end]).decode('utf-8')
+
+    def start_merge(self):
+        # Rewriting the arrays takes about a second for a few hundred thousand titles, so it
+        # runs on a worker from a copy of the pending titles
+        if self.merging or not self.pending_ids:
+            return
+        self.merging = True
+        self.scheduler.submit(self.merge, self.base, self.generation + 1, list(self.pending_ids),
+                              list(self.pending_titles), list(self.pending_popularity), priority=PRIORITY_BACKGROUND)
+
+    def merge(self, base, generation, ids, titles, popularity):
+        # Worker side. The manifest is rewritten last, so a crash halfway leaves the previous
+        # generation in use
+        written = 0
+        try:
+            arrays = merge_arrays(base, ids, titles, popularity)
+            os.makedirs(self.path, exist_ok=True)
+            for name, array in arrays.items():
+                np.save(array_path(self.path, name, generation), array)
+            manifest = os.path.join(self.path, 'manifest.json')
+            with open(f"{manifest}.tmp", 'w') as f:
+                json.dump({'generation': generation, 'count': len(arrays['ids'])}, f)
+            os.replace(f"{manifest}.tmp", manifest)
+            written = generation
+        except OSError:
+            pass
+        finally:
+            self.merge_finished.emit(written, len(ids))
+
+    def on_merge_finished(self, generation, count):
+        self.merging = False
+        if not generation:
+            return
+        try:
+            base = open_generation(self.path, generation)
+        except (OSError, ValueError):
+            return
+        old_generation = self.generation
+        # Titles added while the merge ran keep their entry numbers, the merged ones now come first
+        remaining = list(zip(self.pending_ids[count:], self.pending_titles[count:], self.pending_popularity[count:]))
+        self.use_generation(generation, base)
+        self.clear_pending()
+        for key, title, popularity in remaining:
+            self.add_entry(key, title, popularity)
+        for name in ARRAYS:
+            try:
+                os.remove(array_path(self.path, name, old_generation))
+            except OSError:
+                pass
+
+    def flush(self):
+        # On close only the unmerged titles are written, they are added again on the next start
+        os.makedirs(self.path, exist_ok=True)
+        path = os.path.join(self.path, 'pending.json')
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump([list(entry) for entry in zip(self.pending_ids, self.pending_titles, self.pending_popularity)], f)
+        os.replace(f"{path}.tmp", path)
+
+
+def merge_arrays(base, ids, titles, popularity):
+    # Merged (gram, entry) pairs are unpacked from CSR, the new titles' pairs added and all
+    # sorted again; new titles are numbered on after the merged ones
+    base_count = len(base['ids']) if base else 0
+    pairs = [(gram_key(gram), base_count + offset) for offset, title in enumerate(titles)
+             for gram in trigrams(title)]
+    pair_keys = [np.array([key for key, _ in pairs], dtype=np.int64)]
+    pair_entries = [np.array([entry for _, entry in pairs], dtype=np.int32)]
+    encoded = [title.encode('utf-8') for title in titles]
+    lengths = np.array([len(title) for title in encoded], dtype=np.int64)
+    ids = np.asarray(ids, dtype=np.int64)
+    popularity = np.asarray(popularity, dtype=np.float32)
+    gram_counts = np.array([len(trigrams(title)) for title in titles], dtype=np.uint16)
+    title_bytes = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    title_offsets = np.concatenate([[0], np.cumsum(lengths)])
+    if base_count:
+        pair_keys.insert(0, np.repeat(base['keys'], np.diff(base['offsets'])))
+        pair_entries.insert(0, np.asarray(base['postings']))
+        ids = np.concatenate([base['ids'], ids])
+        popularity = np.concatenate([base['popularity'], popularity])
+        gram_counts = np.concatenate([base['gram_counts'], gram_counts])
+        title_offsets = np.concatenate([base['title_offsets'], title_offsets[1:] + base['title_offsets'][-1]])
+        title_bytes = np.concatenate([base['title_bytes'], title_bytes])
+    pair_keys = np.concatenate(pair_keys)
+    pair_entries = np.concatenate(pair_entries)
+    order = np.lexsort((pair_entries, pair_keys))
+    pair_keys, pair_entries = pair_keys[order], pair_entries[order]
+    keys, starts = np.unique(pair_keys, return_index=True)
+    return {
+        'keys': keys,
+        'offsets': np.append(starts, len(pair_keys)).astype(np.int64),
+        'postings': pair_entries.astype(np.int32),
+        'ids': ids,
+        'id_order': np.argsort(ids, kind='stable'),
+        'popularity': popularity,
+        'gram_counts': gram_counts,
+        'title_offsets': title_offsets.astype(np.int64),
+        'title_bytes': title_bytes,
+    }
+
+
+title_index = None
+
+
+def get_title_index():
+    global title_index
+    if title_index is None:
+        title_index = TitleIndex()
+    return title_index
@@ -0,0 +1,140 @@
+import json
+import os
+import time
+
+from http_session import REQUEST_TIMEOUT, get_session
+from metrics import endpoint_label, metrics
+from single_flight import SingleFlight
+
+
+# Overridable so the app can be pointed at a local stand-in, see benchmarks/fake_tmdb.py
+API_BASE_URL = os.environ.get("TMDB_API_BASE_URL", "https://api.themoviedb.org/3/")
+# How many times a request still rate limited after the session's own retries waits its turn again
+RATE_LIMIT_RETRIES = 3
+
+
+class TMDBClient:
+    def __init__(self, bearer_token='', cache=None, rate_limiter=None):
+        self.bearer_token = bearer_token
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        # The same title is often asked for by several tabs at once
+        self.details_flight = SingleFlight('details')
+
+    def headers(self):
+        return {
+            "accept": "application/json",
+            "Authorization": f"Bearer {self.bearer_token}"
+        }
+
+    def send(self, method, url, label, **kwargs):
+        # Every call that goes out to TMDB takes a token first, so bursts queue up here
+        # instead of coming back as 429
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            response = get_session().request(method, url, timeout=REQUEST_TIMEOUT, **kwargs)
+            # Retries the session did on its own are in the retry history of the response
+            retries = getattr(response.raw, 'retries', None)
+            session_retries = len(retries.history) if retries is not None else 0
+            if attempt or session_retries:
+                metrics.increment('api_retries_total', bool(attempt) + session_retries, endpoint=label)
+            metrics.increment('api_response_bytes_total', len(response.content), endpoint=label)
+            if response.status_code != 429 or not self.rate_limiter or attempt == RATE_LIMIT_RETRIES:
+                return response
+            self.rate_limiter.pause(retry_after(response))
+        return response
+
+    def request(self, endpoint, params=None, method='GET'):
+        label = endpoint_label(endpoint)
+        started = time.perf_counter()
+        cache_status = 'error'
+        try:
+            data, cache_status = self.fetch(endpoint, label, params, method)
+            return data
+        except Exception:
+            metrics.increment('api_errors_total', endpoint=label)
+            raise
+        finally:
+            metrics.observe('api_request_seconds', time.perf_counter() - started, endpoint=label, cache=cache_status)
+
+    def fetch(self, endpoint, label, params, method):
+        # Decoded body and where it came from: fresh, revalidated, miss, uncached or post
+        url = f"{API_BASE_URL}{endpoint}"
+        headers = self.headers()
+
+        if method == 'POST':
+            response = self.send('POST', url, label, headers=headers, json=params)
+            response.raise_for_status()
+            return parse_json(label, response.json), 'post'
+
+        if self.cache is None:
+            response = self.send('GET', url, label, headers=headers, params=params)
+            response.raise_for_status()
+            return parse_json(label, response.json), 'uncached'
+
+        key = self.cache.make_key(endpoint, params, self.bearer_token)
+        entry = self.cache.get(key)
+        if entry and entry['fresh']:
+            return parse_json(label, json.loads, entry['body']), 'fresh'
+
+        # Stale entries are revalidated instead of refetched
+        if entry:
+            if entry['etag']:
+                headers["If-None-Match"] = entry['etag']
+            if entry['last_modified']:
+                headers["If-Modified-Since"] = entry['last_modified']
+
+        response = self.send('GET', url, label, headers=headers, params=params)
+        if response.status_code == 304 and entry:
+            self.cache.refresh(key, endpoint)
+            return parse_json(label, json.loads, entry['body']), 'revalidated'
+        response.raise_for_status()
+        self.cache.put(key, endpoint, response.text,
+                       response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return parse_json(label, response.json), 'miss'
+
+    def get_details(self, media_type, tmdb_id):
+        return self.details_flight.do((media_type, tmdb_id), self.fetch_details, media_type, tmdb_id)
+
+    def fetch_details(self, media_type, tmdb_id):
+        data = self.request(f"{media_type}/{tmdb_id}", params=DETAILS_PARAMS)
+        return normalize_details(data) if data else None
+
+
+def parse_json(label, parse, *args):
+    with metrics.timed('api_parse_seconds', endpoint=label):
+        return parse(*args)
+
+
+def retry_after(response, default=1.0):
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", default)))
+    except ValueError:
+        return default
+
+
+# Credits, external ids and videos ride along with the details call
+DETAILS_PARAMS = {
+    "language": "en-US",
+    "append_to_response": "credits,external_ids,videos"
+}
+
+
+def normalize_details(data):
+    # Flatten appended sub-resources into the shape MovieItemWidget expects
+    credits = data.pop('credits', None) or {}
+    external_ids = data.pop('external_ids', None) or {}
+    videos = data.pop('videos', None) or {}
+    data['cast'] = credits.get('cast', [])
+    data['imdb_id'] = external_ids.get('imdb_id') or data.get('imdb_id')
+    data['trailer_url'] = get_trailer_url(videos.get('results', []))
+    return data
+
+
+def get_trailer_url(videos):
+    for video in videos:
+        if video['type'] == 'Trailer' and video['site'] == 'YouTube':
+            key = video['key']
+            return f"https://www.youtube.com/embed/{key}"
+    return None
@@ -1,39 +1,70 @@
 import sys
-import json
-import requests
+from startup_report import startup_report  # First, so the import phase is timed too
 import os
-import weakref
+import time
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton,
-    QLineEdit, QListWidget, QListWidgetItem, QTabWidget, QMessageBox, QMenu,
+    QLineEdit, QTabWidget, QMessageBox,
     QHBoxLayout, QGridLayout, QScrollArea, QDialog, QComboBox, QSlider,
-    QFormLayout
+    QFormLayout, QCompleter
 )
-from PyQt6.QtGui import QDesktopServices, QPixmap, QIcon, QFont, QAction
-from PyQt6.QtCore import Qt, QUrl, QSize, QThread, pyqtSignal, QObject, QSettings
-from PyQt6.QtWebEngineWidgets import QWebEngineView
+from PyQt6.QtGui import QDesktopServices, QIcon, QFont, QAction
+from PyQt6.QtCore import Qt, QUrl, QObject, QSettings, QTimer, QStringListModel
+
+from http_session import configure_session
+from response_cache import ResponseCache
+from tmdb_client import TMDBClient
+from detail_hydrator import DetailHydrator
+from diagnostics_panel import DiagnosticsPanel
+from catalog import Catalog
+from watch_later_store import WatchLaterStore
+from image_cache import get_image_cache
+from image_loader import get_image_loader, image_flight
+from image_sizes import get_image_sizes
+from metrics import metrics
+from paged_feed import DataLoaderThread, PagedFeed, TMDB_PAGE_SIZE
+from request_scheduler import (
+    TokenBucket, PRIORITY_VISIBLE, PRIORITY_NORMAL, PRIORITY_PREFETCH, PRIORITY_BACKGROUND,
+    get_image_scheduler, get_request_scheduler
+)
+from result_list import ResultListView
+from result_store import ResultStore
+from stall_watchdog import get_stall_watchdog
+from title_index import get_title_index
+from tracing import TRACE_ENV, tracer
+from web_engine import create_web_view, prepare_application
+
+
+# Pause in typing after which the search box searches by itself
+SEARCH_DEBOUNCE_MS = 300
+SEARCH_CACHED_PAGES = 200
+# Label, result store sort key, descending
+SEARCH_SORTS = [
+    ("Relevance", 'position', False),
+    ("Rating", 'rating', True),
+    ("Popularity", 'popularity', True),
+    ("Newest", 'year', True),
+    ("Shortest", 'runtime', False),
+]
+# While filters hide most rows, pages keep being loaded until a page worth shows or this many are in
+SEARCH_FILTER_MAX_PAGES = 10
 
 
 class MovieItemWidget(QWidget):
-    image_cache = weakref.WeakValueDictionary()
-
     def __init__(self, movie, parent=None, add_watch_later_callback=None):
         super().__init__(parent)
         self.movie = movie
         self.add_watch_later_callback = add_watch_later_callback
         self.poster_label = QLabel()
-        self.init_ui()
+        with metrics.timed('widget_build_seconds', widget=type(self).__name__):
+            self.init_ui()
 
     def init_ui(self):
         main_layout = QVBoxLayout()
         content_layout = QHBoxLayout()
 
         # Poster Image
-        pixmap = self.get_image(self.movie.get('poster_path'))
-        if pixmap:
-            self.poster_label.setPixmap(pixmap.scaled(200, 300, Qt.AspectRatioMode.KeepAspectRatio))
-        else:
-            self.poster_label.setText("No Image")
+        self.load_image(self.poster_label, self.movie.get('poster_path'), 'poster', 200, 300)
         content_layout.addWidget(self.poster_label)
 
         # Movie Information
@@ -97,25 +128,22 @@ class MovieItemWidget(QWidget):
         main_layout.addLayout(content_layout)
         self.setLayout(main_layout)
 
-    def get_image(self, path, size='w342'):
-        if path:
-            cache_key = (path, size)
-            if cache_key in self.image_cache:
-                return self.image_cache[cache_key]
+    def load_image(self, label, path, kind, width, height):
+        if not path:
+            label.setText("No Image")
+            return
+
+        def show_pixmap(pixmap):
+            if pixmap:
+                label.setPixmap(pixmap)
             else:
-                base_url = f"https://image.tmdb.org/t/p/{size}"
-                url = base_url + path
-                try:
-                    response = requests.get(url)
-                    response.raise_for_status()
-                    pixmap = QPixmap()
-                    pixmap.loadFromData(response.content)
-                    self.image_cache[cache_key] = pixmap
-                    return pixmap
-                except requests.RequestException:
-                    return None
-        else:
-            return None
+                label.setText("No Image")
+
+        # Placeholder until the image is downloaded and scaled off the GUI thread, cache hits replace it right away
+        label.setText("Loading...")
+        # Smallest TMDB variant that covers the box on this screen
+        size = get_image_sizes().pick(kind, (width, height))
+        get_image_loader().load_progressive(path, size, show_pixmap, owner=self, box=(width, height))
 
     def create_cast_widget(self):
         cast_layout = QVBoxLayout()
@@ -130,11 +158,7 @@ class MovieItemWidget(QWidget):
         for index, member in enumerate(cast_members):
             actor_layout = QVBoxLayout()
             actor_image_label = QLabel()
-            profile_pixmap = self.get_image(member.get('profile_path'), size='w185')
-            if profile_pixmap:
-                actor_image_label.setPixmap(profile_pixmap.scaled(80, 120, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
-            else:
-                actor_image_label.setText("No Image")
+            self.load_image(actor_image_label, member.get('profile_path'), 'profile', 80, 120)
             actor_name_label = QLabel(member.get('name', 'Unknown'))
             actor_name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
             actor_layout.addWidget(actor_image_label)
@@ -191,60 +215,21 @@ class TrailerDialog(QDialog):
         self.setWindowTitle("Trailer")
         self.resize(800, 600)
         layout = QVBoxLayout()
-        self.web_view = QWebEngineView()
+        self.web_view = create_web_view()
         self.web_view.setUrl(QUrl(trailer_url))
         layout.addWidget(self.web_view)
         self.setLayout(layout)
         self.setStyleSheet("background-color: #2E2E2E;")
 
 
-class CustomListWidget(QListWidget):
-    def __init__(self, parent=None, item_clicked_callback=None):
+class ItemDetailsDialog(QDialog):
+    def __init__(self, item_widget, title, parent=None):
         super().__init__(parent)
-        self.item_clicked_callback = item_clicked_callback
-        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        self.customContextMenuRequested.connect(self.show_context_menu)
-
-    def show_context_menu(self, position):
-        item = self.itemAt(position)
-        if item:
-            menu = QMenu(self)
-            play_action = QAction("Play in Embedded Player", self)
-            open_browser_action = QAction("Open in Browser", self)
-            play_action.triggered.connect(lambda: self.item_clicked_callback(item, 'embedded'))
-            open_browser_action.triggered.connect(lambda: self.item_clicked_callback(item, 'browser'))
-            menu.addAction(play_action)
-            menu.addAction(open_browser_action)
-            menu.exec(self.mapToGlobal(position))
-
-    def play_movie_embedded(self, movie_id):
-        embed_url = f"https://vidbinge.net/embed/movie/{movie_id}"
-        self.web_view.setUrl(QUrl(embed_url))
-        if self.tabs.indexOf(self.player_tab) == -1:
-            self.tabs.addTab(self.player_tab, "Player")
-        self.tabs.setCurrentWidget(self.player_tab)
-
-    def play_movie_in_browser(self, movie_id):
-        embed_url = f"https://vidbinge.dev/embed/movie/{movie_id}"
-        QDesktopServices.openUrl(QUrl(embed_url))
-
-class DataLoaderThread(QThread):
-    data_loaded = pyqtSignal(dict)
-
-    def __init__(self, api_endpoint, params, headers):
-        super().__init__()
-        self.api_endpoint = api_endpoint
-        self.params = params
-        self.headers = headers
-
-    def run(self):
-        try:
-            response = requests.get(self.api_endpoint, headers=self.headers, params=self.params)
-            response.raise_for_status()
-            data = response.json()
-            self.data_loaded.emit(data)
-        except requests.exceptions.RequestException as e:
-            self.data_loaded.emit({'error': str(e)})
+        self.setWindowTitle(title)
+        self.resize(1000, 400)
+        layout = QVBoxLayout()
+        layout.addWidget(item_widget)
+        self.setLayout(layout)
 
 
 class TMDBApp(QMainWindow):
@@ -254,12 +239,29 @@ class TMDBApp(QMainWindow):
         self.setGeometry(100, 100, 1000, 800)
 
         self.bearer_token = ""  # Bearer token for authentication
-        self.watch_later_list = []
 
         self.load_config()
+        configure_session(self.http_pool_size, self.http_retries, proxies=self.get_proxies())
+        self.tmdb_client = TMDBClient(
+            self.bearer_token,
+            ResponseCache(max_bytes=self.response_cache_mb * 1024 * 1024),
+            TokenBucket(rate=self.requests_per_second, capacity=self.requests_per_second // 2 or 1)
+        )
+        # Image size variants TMDB offers, fetched in the background
+        get_request_scheduler().submit(get_image_sizes().load, self.tmdb_client, priority=PRIORITY_BACKGROUND)
+        self.catalog = Catalog()
+        self.watch_later = WatchLaterStore()
+        self.watch_later.migrate_json('watch_later.json', self.catalog)
+        startup_report.mark("config")
+        self.detail_hydrator = DetailHydrator(self.tmdb_client, self.max_concurrent_requests, catalog=self.catalog)
+        self.detail_hydrator.item_loaded.connect(self.on_detail_loaded)
+        self.detail_hydrator.batch_finished.connect(self.on_detail_batch_finished)
+        self.hydration_targets = {}
+        self.prefetch_batches = {}
 
         self.init_ui()
         self.apply_stylesheet()
+        startup_report.mark("window build")
 
     def load_config(self):
         self.settings = QSettings("tmdb_app_settings.ini", QSettings.Format.IniFormat)
@@ -269,16 +271,11 @@ class TMDBApp(QMainWindow):
         self.proxy_enabled = self.settings.value('proxy_enabled', False, type=bool)
         self.proxy_address = self.settings.value('proxy_address', '')
         self.proxy_port = int(self.settings.value('proxy_port', 0))
-
-        # Load Watch Later list
-        if os.path.exists('watch_later.json'):
-            try:
-                with open('watch_later.json', 'r') as f:
-                    self.watch_later_list = json.load(f)
-            except json.JSONDecodeError:
-                self.watch_later_list = []
-        else:
-            self.watch_later_list = []
+        self.response_cache_mb = int(self.settings.value('response_cache_mb', 50))
+        self.max_concurrent_requests = int(self.settings.value('max_concurrent_requests', 8))
+        self.http_pool_size = int(self.settings.value('http_pool_size', 20))
+        self.http_retries = int(self.settings.value('http_retries', 3))
+        self.requests_per_second = int(self.settings.value('requests_per_second', 40))
 
     def save_config(self):
         self.settings.setValue('bearer_token', self.bearer_token)
@@ -287,10 +284,11 @@ class TMDBApp(QMainWindow):
         self.settings.setValue('proxy_enabled', self.proxy_enabled)
         self.settings.setValue('proxy_address', self.proxy_address)
         self.settings.setValue('proxy_port', self.proxy_port)
-
-        # Save Watch Later list
-        with open('watch_later.json', 'w') as f:
-            json.dump(self.watch_later_list, f)
+        self.settings.setValue('response_cache_mb', self.response_cache_mb)
+        self.settings.setValue('max_concurrent_requests', self.max_concurrent_requests)
+        self.settings.setValue('http_pool_size', self.http_pool_size)
+        self.settings.setValue('http_retries', self.http_retries)
+        self.settings.setValue('requests_per_second', self.requests_per_second)
 
     def init_ui(self):
         self.create_menu_bar()
@@ -300,27 +298,31 @@ class TMDBApp(QMainWindow):
         self.tabs.tabCloseRequested.connect(self.close_tab)
         self.setCentralWidget(self.tabs)
 
-        self.favorites_tab = QWidget()
-        self.search_tab = QWidget()
-        self.settings_tab = QWidget()
-        self.player_tab = QWidget()
-        self.now_playing_tab = QWidget()
-        self.top_rated_tab = QWidget()
-        self.tv_shows_tab = QWidget()
-        self.watch_later_tab = QWidget()
-
-        self.init_favorites_tab()
-        self.init_search_tab()
-        self.init_settings_tab()
-        self.init_player_tab()
-        self.init_now_playing_tab()
-        self.init_top_rated_tab()
-        self.init_tv_shows_tab()
-        self.init_watch_later_tab()
-
-        # Add initial tabs
-        self.tabs.addTab(self.favorites_tab, "Favorites")
-        self.tabs.addTab(self.search_tab, "Search")
+        # Tab pages are built by get_tab the first time they are opened
+        self.favorites_tab = None
+        self.search_tab = None
+        self.settings_tab = None
+        self.player_tab = None
+        self.now_playing_tab = None
+        self.top_rated_tab = None
+        self.tv_shows_tab = None
+        self.watch_later_tab = None
+        self.diagnostics_tab = None
+        self.loader_threads = set()
+        self.favorites_generation = 0
+
+        # Add initial tabs, favorites are fetched once the window is up
+        self.tabs.addTab(self.get_tab('favorites'), "Favorites")
+        self.tabs.addTab(self.get_tab('search'), "Search")
+        QTimer.singleShot(0, self.load_favorites)
+
+    def get_tab(self, name):
+        tab = getattr(self, f"{name}_tab")
+        if tab is None:
+            tab = QWidget()
+            setattr(self, f"{name}_tab", tab)
+            getattr(self, f"init_{name}_tab")()
+        return tab
 
     def create_menu_bar(self):
         menu_bar = self.menuBar()
@@ -330,10 +332,24 @@ class TMDBApp(QMainWindow):
 
         settings_action = QAction("Settings", self)
         settings_action.triggered.connect(self.open_settings_tab)
+        image_cache_action = QAction("Image Cache Stats", self)
+        image_cache_action.triggered.connect(self.show_image_cache_stats)
+        request_queue_action = QAction("Request Queue Stats", self)
+        request_queue_action.triggered.connect(self.show_request_queue_stats)
+        diagnostics_action = QAction("Diagnostics", self)
+        diagnostics_action.triggered.connect(self.open_diagnostics_tab)
+        self.trace_action = QAction("Record Trace", self)
+        self.trace_action.setCheckable(True)
+        self.trace_action.setChecked(tracer.enabled)
+        self.trace_action.toggled.connect(self.toggle_trace)
         exit_action = QAction("Exit", self)
         exit_action.triggered.connect(self.close)
 
         home_menu.addAction(settings_action)
+        home_menu.addAction(image_cache_action)
+        home_menu.addAction(request_queue_action)
+        home_menu.addAction(diagnostics_action)
+        home_menu.addAction(self.trace_action)
         home_menu.addAction(exit_action)
 
         # My Videos Menu
@@ -369,54 +385,77 @@ class TMDBApp(QMainWindow):
 
     def init_favorites_tab(self):
         layout = QVBoxLayout()
-        self.favorites_list = CustomListWidget(item_clicked_callback=self.handle_item_action)
+        self.favorites_list = ResultListView(item_clicked_callback=self.handle_item_action)
         layout.addWidget(self.favorites_list)
         self.favorites_tab.setLayout(layout)
-        self.load_favorites()
 
     def init_search_tab(self):
         layout = QVBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search for movies...")
         self.search_button = QPushButton("Search")
-        self.search_button.clicked.connect(self.search_movies)
-        self.search_results = CustomListWidget(item_clicked_callback=self.handle_item_action)
-
-        # Search Filters
+        self.search_button.clicked.connect(lambda: self.search_movies())
+        # Searching as you type, once typing has paused for a moment
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(lambda: self.search_movies(typed=True))
+        self.search_input.textChanged.connect(self.search_timer.start)
+        # Titles seen before complete what is typed right away, misspelled or not
+        self.search_completer = QCompleter(QStringListModel(self), self)
+        self.search_completer.setWidget(self.search_input)
+        self.search_completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.search_completer.activated[str].connect(self.on_completion_chosen)
+        self.search_input.textEdited.connect(self.update_completions)
+        self.search_results = ResultListView(item_clicked_callback=self.handle_item_action)
+
+        # Search Filters, applied to the loaded results without asking TMDB again
+        self.search_store = ResultStore()
         filters_layout = QHBoxLayout()
         self.year_input = QLineEdit()
         self.year_input.setPlaceholderText("Year")
         self.genre_input = QLineEdit()
         self.genre_input.setPlaceholderText("Genre")
+        self.min_rating_input = QLineEdit()
+        self.min_rating_input.setPlaceholderText("Min rating")
+        self.max_runtime_input = QLineEdit()
+        self.max_runtime_input.setPlaceholderText("Max minutes")
+        self.sort_combo = QComboBox()
+        self.sort_combo.addItems([label for label, _, _ in SEARCH_SORTS])
         filters_layout.addWidget(QLabel("Year:"))
         filters_layout.addWidget(self.year_input)
         filters_layout.addWidget(QLabel("Genre:"))
         filters_layout.addWidget(self.genre_input)
-
-        # Pagination controls
-        self.search_page = 1
-        self.search_total_pages = 1
-        self.search_loading = False
-
-        nav_layout = QHBoxLayout()
-        self.search_prev_button = QPushButton("Previous")
-        self.search_prev_button.clicked.connect(self.search_prev_page)
-        self.search_next_button = QPushButton("Next")
-        self.search_next_button.clicked.connect(self.search_next_page)
-        self.search_page_label = QLabel(f"Page {self.search_page}")
-        nav_layout.addWidget(self.search_prev_button)
-        nav_layout.addWidget(self.search_page_label)
-        nav_layout.addWidget(self.search_next_button)
+        filters_layout.addWidget(QLabel("Rating:"))
+        filters_layout.addWidget(self.min_rating_input)
+        filters_layout.addWidget(QLabel("Runtime:"))
+        filters_layout.addWidget(self.max_runtime_input)
+        filters_layout.addWidget(QLabel("Sort:"))
+        filters_layout.addWidget(self.sort_combo)
+        for filter_input in (self.year_input, self.genre_input, self.min_rating_input, self.max_runtime_input):
+            filter_input.textChanged.connect(self.apply_search_filters)
+        self.sort_combo.currentIndexChanged.connect(self.apply_search_filters)
+        # Details arrive one by one, the filtered list is rebuilt at most every 50 ms meanwhile
+        self.search_filter_timer = QTimer(self)
+        self.search_filter_timer.setSingleShot(True)
+        self.search_filter_timer.setInterval(50)
+        self.search_filter_timer.timeout.connect(self.apply_search_filters)
 
         # Loading Indicator
         self.search_loading_indicator = QLabel("Loading...")
         self.search_loading_indicator.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.search_loading_indicator.hide()
 
+        self.search_feed = self.create_feed("search/movie", None, 'movie', self.search_results,
+                                            self.search_loading_indicator, "Failed to search movies")
+        # Every prefix typed is a search of its own, going back to one is served from here
+        self.search_feed.max_cached_pages = SEARCH_CACHED_PAGES
+        self.search_feed.page_loaded.connect(self.on_search_page_loaded)
+        self.search_result_ids = []
+
         layout.addWidget(self.search_input)
         layout.addLayout(filters_layout)
         layout.addWidget(self.search_button)
-        layout.addLayout(nav_layout)
         layout.addWidget(self.search_results)
         layout.addWidget(self.search_loading_indicator)
         self.search_tab.setLayout(layout)
@@ -426,6 +465,7 @@ class TMDBApp(QMainWindow):
         self.bearer_token_input = QLineEdit(self.bearer_token)
         self.bearer_token_input.setPlaceholderText("Enter your Bearer Token")
         self.results_per_page_input = QLineEdit(str(self.results_per_page))
+        self.max_concurrent_requests_input = QLineEdit(str(self.max_concurrent_requests))
         self.font_size_slider = QSlider(Qt.Orientation.Horizontal)
         self.font_size_slider.setMinimum(10)
         self.font_size_slider.setMaximum(20)
@@ -449,6 +489,7 @@ class TMDBApp(QMainWindow):
         form_layout = QFormLayout()
         form_layout.addRow(QLabel("TMDB Bearer Token:"), self.bearer_token_input)
         form_layout.addRow(QLabel("Results Per Page:"), self.results_per_page_input)
+        form_layout.addRow(QLabel("Concurrent Requests:"), self.max_concurrent_requests_input)
         form_layout.addRow(QLabel("Font Size:"), self.font_size_slider)
         form_layout.addRow(self.proxy_enabled_checkbox)
         form_layout.addRow(QLabel("Proxy Address:"), self.proxy_address_input)
@@ -458,6 +499,54 @@ class TMDBApp(QMainWindow):
         layout.addWidget(self.save_button)
         self.settings_tab.setLayout(layout)
 
+    def show_image_cache_stats(self):
+        stats = get_image_cache().stats()
+        QMessageBox.information(self, "Image Cache", (
+            f"Memory hits: {stats['memory_hits']}\n"
+            f"Disk hits: {stats['disk_hits']}\n"
+            f"Misses: {stats['misses']}\n"
+            f"Memory evictions: {stats['memory_evictions']}\n"
+            f"Disk evictions: {stats['disk_evictions']}\n"
+            f"In memory: {stats['memory_entries']} images, {stats['memory_bytes'] // 1024} KB\n"
+            f"On disk: {stats['disk_entries']} images"
+        ))
+
+    def show_request_queue_stats(self):
+        stats = get_request_scheduler().stats()
+        limiter = self.tmdb_client.rate_limiter.stats()
+        details = self.tmdb_client.details_flight.stats()
+        images = image_flight.stats()
+        image_stats = get_image_scheduler().stats()
+        queued = stats['queued_by_priority']
+        QMessageBox.information(self, "Request Queue", (
+            f"Workers: {stats['workers']}\n"
+            f"Queued: {stats['queued']} (visible {queued['visible']}, normal {queued['normal']}, "
+            f"prefetch {queued['prefetch']}, background {queued['background']})\n"
+            f"Completed: {stats['completed']} of {stats['submitted']}\n"
+            f"Queue wait: {stats['average_wait'] * 1000:.0f} ms average, {stats['max_wait'] * 1000:.0f} ms max\n"
+            f"Image workers: {image_stats['workers']}, {image_stats['queued']} queued, "
+            f"{image_stats['average_wait'] * 1000:.0f} ms average wait\n"
+            f"Rate limit: {self.requests_per_second}/s, {limiter['throttled']} of {limiter['acquired']} requests held back\n"
+            f"Rate limit wait: {limiter['total_wait']:.1f} s total, {limiter['max_wait'] * 1000:.0f} ms max\n"
+            f"Duplicate detail lookups shared: {details['shared']} ({details['suppression_rate']:.0%})\n"
+            f"Duplicate image downloads shared: {images['shared'] + get_image_loader().joined}"
+        ))
+
+    def toggle_trace(self, recording):
+        if recording:
+            tracer.start()
+            return
+        path = os.environ.get(TRACE_ENV) or time.strftime("trace-%Y%m%d-%H%M%S.json")
+        try:
+            count = tracer.stop(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Could not write the trace:\n{e}")
+            return
+        QMessageBox.information(self, "Trace", (
+            f"Wrote {count} events to {os.path.abspath(path)}\n"
+            f"Open it in ui.perfetto.dev or chrome://tracing"
+        ))
+
     def toggle_proxy_settings(self):
         enabled = self.proxy_enabled_checkbox.isChecked()
         self.proxy_address_input.setEnabled(enabled)
@@ -469,100 +558,68 @@ class TMDBApp(QMainWindow):
 
     def init_player_tab(self):
         layout = QVBoxLayout()
-        self.web_view = QWebEngineView()
+        self.web_view = create_web_view()
         layout.addWidget(self.web_view)
         self.player_tab.setLayout(layout)
 
     def init_now_playing_tab(self):
         layout = QVBoxLayout()
-        self.now_playing_list = CustomListWidget(item_clicked_callback=self.handle_item_action)
-        self.now_playing_page = 1
-        self.now_playing_total_pages = 1
-        self.now_playing_loading = False
-
-        # Navigation Buttons
-        nav_layout = QHBoxLayout()
-        self.now_playing_prev_button = QPushButton("Previous")
-        self.now_playing_prev_button.clicked.connect(self.load_now_playing_prev_page)
-        self.now_playing_next_button = QPushButton("Next")
-        self.now_playing_next_button.clicked.connect(self.load_now_playing_next_page)
-        self.now_playing_page_label = QLabel(f"Page {self.now_playing_page}")
-        nav_layout.addWidget(self.now_playing_prev_button)
-        nav_layout.addWidget(self.now_playing_page_label)
-        nav_layout.addWidget(self.now_playing_next_button)
+        self.now_playing_list = ResultListView(item_clicked_callback=self.handle_item_action)
 
         # Loading Indicator
         self.now_playing_loading_indicator = QLabel("Loading...")
         self.now_playing_loading_indicator.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.now_playing_loading_indicator.hide()
 
-        layout.addLayout(nav_layout)
+        self.now_playing_feed = self.create_feed("movie/now_playing", {"language": "en-US"}, 'movie', self.now_playing_list,
+                                                 self.now_playing_loading_indicator, "Failed to load Now Playing movies")
+
         layout.addWidget(self.now_playing_list)
         layout.addWidget(self.now_playing_loading_indicator)
         self.now_playing_tab.setLayout(layout)
 
     def init_top_rated_tab(self):
         layout = QVBoxLayout()
-        self.top_rated_list = CustomListWidget(item_clicked_callback=self.handle_item_action)
-        self.top_rated_page = 1
-        self.top_rated_total_pages = 1
-        self.top_rated_loading = False
-
-        # Navigation Buttons
-        nav_layout = QHBoxLayout()
-        self.top_rated_prev_button = QPushButton("Previous")
-        self.top_rated_prev_button.clicked.connect(self.load_top_rated_prev_page)
-        self.top_rated_next_button = QPushButton("Next")
-        self.top_rated_next_button.clicked.connect(self.load_top_rated_next_page)
-        self.top_rated_page_label = QLabel(f"Page {self.top_rated_page}")
-        nav_layout.addWidget(self.top_rated_prev_button)
-        nav_layout.addWidget(self.top_rated_page_label)
-        nav_layout.addWidget(self.top_rated_next_button)
+        self.top_rated_list = ResultListView(item_clicked_callback=self.handle_item_action)
 
         # Loading Indicator
         self.top_rated_loading_indicator = QLabel("Loading...")
         self.top_rated_loading_indicator.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.top_rated_loading_indicator.hide()
 
-        layout.addLayout(nav_layout)
+        self.top_rated_feed = self.create_feed("movie/top_rated", {"language": "en-US"}, 'movie', self.top_rated_list,
+                                               self.top_rated_loading_indicator, "Failed to load Top Rated movies")
+
         layout.addWidget(self.top_rated_list)
         layout.addWidget(self.top_rated_loading_indicator)
         self.top_rated_tab.setLayout(layout)
 
     def init_tv_shows_tab(self):
         layout = QVBoxLayout()
-        self.tv_shows_list = CustomListWidget(item_clicked_callback=self.handle_tv_show_action)
-        self.tv_shows_page = 1
-        self.tv_shows_total_pages = 1
-        self.tv_shows_loading = False
-
-        # Navigation Buttons
-        nav_layout = QHBoxLayout()
-        self.tv_shows_prev_button = QPushButton("Previous")
-        self.tv_shows_prev_button.clicked.connect(self.load_tv_shows_prev_page)
-        self.tv_shows_next_button = QPushButton("Next")
-        self.tv_shows_next_button.clicked.connect(self.load_tv_shows_next_page)
-        self.tv_shows_page_label = QLabel(f"Page {self.tv_shows_page}")
-        nav_layout.addWidget(self.tv_shows_prev_button)
-        nav_layout.addWidget(self.tv_shows_page_label)
-        nav_layout.addWidget(self.tv_shows_next_button)
+        self.tv_shows_list = ResultListView(item_clicked_callback=self.handle_tv_show_action)
 
         # Loading Indicator
         self.tv_shows_loading_indicator = QLabel("Loading...")
         self.tv_shows_loading_indicator.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.tv_shows_loading_indicator.hide()
 
-        layout.addLayout(nav_layout)
+        self.tv_shows_feed = self.create_feed("tv/airing_today", {"language": "en-US"}, 'tv', self.tv_shows_list,  # Most recent TV shows
+                                              self.tv_shows_loading_indicator, "Failed to load TV Shows")
+
         layout.addWidget(self.tv_shows_list)
         layout.addWidget(self.tv_shows_loading_indicator)
         self.tv_shows_tab.setLayout(layout)
 
     def init_watch_later_tab(self):
         layout = QVBoxLayout()
-        self.watch_later_list_widget = CustomListWidget(item_clicked_callback=self.handle_item_action)
+        self.watch_later_list_widget = ResultListView(item_clicked_callback=self.handle_watch_later_action)
         layout.addWidget(self.watch_later_list_widget)
         self.watch_later_tab.setLayout(layout)
-        self.load_watch_later()
+
+    def init_diagnostics_tab(self):
+        layout = QVBoxLayout()
+        layout.addWidget(DiagnosticsPanel())
+        self.diagnostics_tab.setLayout(layout)
 
     def close_tab(self, index):
         widget = self.tabs.widget(index)
@@ -570,403 +627,351 @@ class TMDBApp(QMainWindow):
             self.tabs.removeTab(index)
 
     def open_settings_tab(self):
+        self.get_tab('settings')
         if self.tabs.indexOf(self.settings_tab) == -1:
             self.tabs.addTab(self.settings_tab, "Settings")
         self.tabs.setCurrentWidget(self.settings_tab)
 
+    def open_diagnostics_tab(self):
+        self.get_tab('diagnostics')
+        if self.tabs.indexOf(self.diagnostics_tab) == -1:
+            self.tabs.addTab(self.diagnostics_tab, "Diagnostics")
+        self.tabs.setCurrentWidget(self.diagnostics_tab)
+
     def open_favorites_tab(self):
+        self.get_tab('favorites')
         if self.tabs.indexOf(self.favorites_tab) == -1:
             self.tabs.addTab(self.favorites_tab, "Favorites")
             self.load_favorites()
         self.tabs.setCurrentWidget(self.favorites_tab)
 
     def open_now_playing_tab(self):
+        self.get_tab('now_playing')
         if self.tabs.indexOf(self.now_playing_tab) == -1:
             self.tabs.addTab(self.now_playing_tab, "Now Playing")
             self.load_now_playing()
         self.tabs.setCurrentWidget(self.now_playing_tab)
 
     def open_top_rated_tab(self):
+        self.get_tab('top_rated')
         if self.tabs.indexOf(self.top_rated_tab) == -1:
             self.tabs.addTab(self.top_rated_tab, "Top Rated")
             self.load_top_rated()
         self.tabs.setCurrentWidget(self.top_rated_tab)
 
     def open_tv_shows_tab(self):
+        self.get_tab('tv_shows')
         if self.tabs.indexOf(self.tv_shows_tab) == -1:
             self.tabs.addTab(self.tv_shows_tab, "TV Shows")
             self.load_tv_shows()
         self.tabs.setCurrentWidget(self.tv_shows_tab)
 
     def open_watch_later_tab(self):
+        self.get_tab('watch_later')
         if self.tabs.indexOf(self.watch_later_tab) == -1:
             self.tabs.addTab(self.watch_later_tab, "Watch Later")
             self.load_watch_later()
         self.tabs.setCurrentWidget(self.watch_later_tab)
 
     def open_search_tv_tab(self):
+        self.get_tab('search')
         if self.tabs.indexOf(self.search_tab) == -1:
             self.tabs.addTab(self.search_tab, "Search TV Shows")
             self.init_search_tv_tab()
         self.tabs.setCurrentWidget(self.search_tab)
 
-    def tmdb_api_request(self, endpoint, params=None, method='GET'):
-        base_url = "https://api.themoviedb.org/3/"
-        headers = {
-            "accept": "application/json",
-            "Authorization": f"Bearer {self.bearer_token}"
-        }
-
+    def get_proxies(self):
         if self.proxy_enabled:
-            proxies = {
+            return {
                 "http": f"http://{self.proxy_address}:{self.proxy_port}",
                 "https": f"http://{self.proxy_address}:{self.proxy_port}",
             }
-        else:
-            proxies = None
-
-        url = f"{base_url}{endpoint}"
-
-        try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, params=params, proxies=proxies)
-            elif method == 'POST':
-                response = requests.post(url, headers=headers, json=params, proxies=proxies)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            QMessageBox.critical(self, "Error", f"TMDB API request failed: {e}")
-            return None
+        return None
 
     def clear_list_widget(self, list_widget):
-        while list_widget.count():
-            item = list_widget.takeItem(0)
-            widget = list_widget.itemWidget(item)
-            if widget:
-                widget.deleteLater()
-            del item
+        for batch_id, (target, media_type, report_errors) in list(self.hydration_targets.items()):
+            if target is list_widget:
+                self.detail_hydrator.cancel(batch_id)
+                del self.hydration_targets[batch_id]
+        for batch_id, target in list(self.prefetch_batches.items()):
+            if target is list_widget:
+                self.detail_hydrator.cancel(batch_id)
+                del self.prefetch_batches[batch_id]
+        if self.search_tab is not None and list_widget is self.search_results:
+            self.search_store.clear()
+        list_widget.model().clear()
 
     def load_favorites(self):
         if not self.bearer_token:
             QMessageBox.warning(self, "Warning", "Please set your Bearer Token in the Settings tab.")
             return
 
-        account_details = self.tmdb_api_request("account")
-        if account_details:
-            account_id = account_details['id']
-        else:
-            QMessageBox.critical(self, "Error", "Failed to retrieve account details.")
-            return
-
+        # Account and favorites pages are fetched off the GUI thread, a newer load
+        # makes the answers of an older one be ignored
+        self.favorites_generation += 1
+        generation = self.favorites_generation
         self.clear_list_widget(self.favorites_list)
-        page = 1
-        total_pages = 1
-        while page <= total_pages:
-            data = self.tmdb_api_request(f"account/{account_id}/favorite/movies", params={
-                "language": "en-US",
-                "sort_by": "created_at.asc",
-                "page": page
-            })
-            if data:
-                total_pages = data.get('total_pages', 1)
-                items_to_display = data['results'][:self.results_per_page]
-                for movie_summary in items_to_display:
-                    movie = self.get_movie_details(movie_summary['id'])
-                    if movie:
-                        item = QListWidgetItem()
-                        item.setSizeHint(QSize(400, 300))
-                        item.setData(Qt.ItemDataRole.UserRole, movie)
-                        widget = MovieItemWidget(movie, add_watch_later_callback=self.add_to_watch_later)
-                        self.favorites_list.addItem(item)
-                        self.favorites_list.setItemWidget(item, widget)
-                page += 1
-            else:
-                QMessageBox.critical(self, "Error", "Failed to load favorite movies.")
-                break
-
-    # Now Playing Methods
-    def load_now_playing_prev_page(self):
-        if self.now_playing_page > 1:
-            self.now_playing_page -= 1
-            self.load_now_playing()
-
-    def load_now_playing_next_page(self):
-        if self.now_playing_page < self.now_playing_total_pages:
-            self.now_playing_page += 1
-            self.load_now_playing()
-
-    def load_now_playing(self):
-        if self.now_playing_loading:
-            return  # Prevent multiple loads at the same time
-        self.now_playing_loading = True
-        self.now_playing_loading_indicator.show()
-        self.clear_list_widget(self.now_playing_list)
-        self.now_playing_page_label.setText(f"Page {self.now_playing_page}")
+        self.start_loader("account", None, lambda data: self.on_account_loaded(generation, data))
 
-        endpoint = "movie/now_playing"
-        params = {"language": "en-US", "page": self.now_playing_page}
-        headers = {
-            "accept": "application/json",
-            "Authorization": f"Bearer {self.bearer_token}"
-        }
-        api_url = f"https://api.themoviedb.org/3/{endpoint}"
+    def on_account_loaded(self, generation, data):
+        if generation != self.favorites_generation:
+            return
+        if 'error' in data:
+            QMessageBox.critical(self, "Error", f"Failed to retrieve account details:\n{data['error']}")
+            return
+        self.load_favorites_page(generation, data['id'], 1)
 
-        self.now_playing_thread = DataLoaderThread(api_url, params, headers)
-        self.now_playing_thread.data_loaded.connect(self.on_now_playing_data_loaded)
-        self.now_playing_thread.start()
+    def load_favorites_page(self, generation, account_id, page):
+        self.start_loader(f"account/{account_id}/favorite/movies", {
+            "language": "en-US",
+            "sort_by": "created_at.asc",
+            "page": page
+        }, lambda data: self.on_favorites_page_loaded(generation, account_id, page, data))
 
-    def on_now_playing_data_loaded(self, data):
-        self.now_playing_loading = False
-        self.now_playing_loading_indicator.hide()
+    def on_favorites_page_loaded(self, generation, account_id, page, data):
+        if generation != self.favorites_generation:
+            return
         if 'error' in data:
-            QMessageBox.critical(self, "Error", f"Failed to load Now Playing movies:\n{data['error']}")
+            QMessageBox.critical(self, "Error", f"Failed to load favorite movies:\n{data['error']}")
+            return
+        items_to_display = data['results'][:self.results_per_page]
+        get_title_index().add_many('movie', data['results'])
+        self.hydrate_list(self.favorites_list, 'movie', items_to_display,
+                          start=(page - 1) * self.results_per_page)
+        if page == 1:
+            # Page count is known now, the rest can all be fetched at once
+            for next_page in range(2, data.get('total_pages', 1) + 1):
+                self.load_favorites_page(generation, account_id, next_page)
+
+    def start_loader(self, endpoint, params, callback):
+        thread = DataLoaderThread(self.tmdb_client, endpoint, params)
+        thread.data_loaded.connect(callback)
+        # Keep the thread referenced until it has really stopped running
+        thread.finished.connect(lambda: self.loader_threads.discard(thread))
+        self.loader_threads.add(thread)
+        thread.start()
+
+    # Paginated Feed Methods
+    def create_feed(self, endpoint, params, media_type, list_widget, loading_indicator, error_message):
+        feed = PagedFeed(self.tmdb_client, endpoint, params, parent=self)
+        feed.page_loaded.connect(lambda page, results: self.on_feed_page_loaded(list_widget, media_type, page, results))
+        feed.page_prefetched.connect(lambda page, results: self.prefetch_details(list_widget, media_type, results))
+        feed.loading_changed.connect(loading_indicator.setVisible)
+        feed.load_failed.connect(lambda page, error: QMessageBox.critical(self, "Error", f"{error_message}:\n{error}"))
+        list_widget.near_end.connect(feed.load_more)
+        return feed
+
+    def on_feed_page_loaded(self, list_widget, media_type, page, results):
+        # Summary rows show up right away, details fill them in as they arrive
+        start = (page - 1) * TMDB_PAGE_SIZE
+        with tracer.span('add rows', 'gui', page=page, rows=len(results)):
+            for offset, summary in enumerate(results):
+                self.add_row(list_widget, summary, start + offset)
+        get_title_index().add_many(media_type, results)
+        self.hydrate_list(list_widget, media_type, results, start, PRIORITY_VISIBLE)
+
+    def add_row(self, list_widget, item, position):
+        if self.search_tab is not None and list_widget is self.search_results:
+            self.add_search_row(item, position)
         else:
-            self.now_playing_total_pages = data.get('total_pages', 1)
-            items_to_display = data['results'][:self.results_per_page]
-            for movie_summary in items_to_display:
-                movie = self.get_movie_details(movie_summary['id'])
-                if movie:
-                    item = QListWidgetItem()
-                    item.setSizeHint(QSize(400, 300))
-                    item.setData(Qt.ItemDataRole.UserRole, movie)
-                    widget = MovieItemWidget(movie, add_watch_later_callback=self.add_to_watch_later)
-                    self.now_playing_list.addItem(item)
-                    self.now_playing_list.setItemWidget(item, widget)
-
-    # Top Rated Methods
-    def load_top_rated_prev_page(self):
-        if self.top_rated_page > 1:
-            self.top_rated_page -= 1
-            self.load_top_rated()
+            list_widget.model().add_item(item, position)
 
-    def load_top_rated_next_page(self):
-        if self.top_rated_page < self.top_rated_total_pages:
-            self.top_rated_page += 1
-            self.load_top_rated()
+    def prefetch_details(self, list_widget, media_type, results):
+        # Nobody is waiting for these, they only warm the response cache for the next page
+        if not results:
+            return
+        batch_id = self.detail_hydrator.hydrate(media_type, [summary['id'] for summary in results],
+                                                priority=PRIORITY_PREFETCH)
+        self.prefetch_batches[batch_id] = list_widget
+
+    def load_now_playing(self):
+        self.clear_list_widget(self.now_playing_list)
+        self.now_playing_feed.restart()
 
     def load_top_rated(self):
-        if self.top_rated_loading:
-            return  # Prevent multiple loads at the same time
-        self.top_rated_loading = True
-        self.top_rated_loading_indicator.show()
         self.clear_list_widget(self.top_rated_list)
-        self.top_rated_page_label.setText(f"Page {self.top_rated_page}")
-
-        endpoint = "movie/top_rated"
-        params = {"language": "en-US", "page": self.top_rated_page}
-        headers = {
-            "accept": "application/json",
-            "Authorization": f"Bearer {self.bearer_token}"
-        }
-        api_url = f"https://api.themoviedb.org/3/{endpoint}"
-
-        self.top_rated_thread = DataLoaderThread(api_url, params, headers)
-        self.top_rated_thread.data_loaded.connect(self.on_top_rated_data_loaded)
-        self.top_rated_thread.start()
-
-    def on_top_rated_data_loaded(self, data):
-        self.top_rated_loading = False
-        self.top_rated_loading_indicator.hide()
-        if 'error' in data:
-            QMessageBox.critical(self, "Error", f"Failed to load Top Rated movies:\n{data['error']}")
-        else:
-            self.top_rated_total_pages = data.get('total_pages', 1)
-            items_to_display = data['results'][:self.results_per_page]
-            for movie_summary in items_to_display:
-                movie = self.get_movie_details(movie_summary['id'])
-                if movie:
-                    item = QListWidgetItem()
-                    item.setSizeHint(QSize(400, 300))
-                    item.setData(Qt.ItemDataRole.UserRole, movie)
-                    widget = MovieItemWidget(movie, add_watch_later_callback=self.add_to_watch_later)
-                    self.top_rated_list.addItem(item)
-                    self.top_rated_list.setItemWidget(item, widget)
-
-    # TV Shows Methods
-    def load_tv_shows_prev_page(self):
-        if self.tv_shows_page > 1:
-            self.tv_shows_page -= 1
-            self.load_tv_shows()
-
-    def load_tv_shows_next_page(self):
-        if self.tv_shows_page < self.tv_shows_total_pages:
-            self.tv_shows_page += 1
-            self.load_tv_shows()
+        self.top_rated_feed.restart()
 
     def load_tv_shows(self):
-        if self.tv_shows_loading:
-            return  # Prevent multiple loads at the same time
-        self.tv_shows_loading = True
-        self.tv_shows_loading_indicator.show()
         self.clear_list_widget(self.tv_shows_list)
-        self.tv_shows_page_label.setText(f"Page {self.tv_shows_page}")
-
-        endpoint = "tv/airing_today"  # Changed to show most recent TV shows
-        params = {"language": "en-US", "page": self.tv_shows_page}
-        headers = {
-            "accept": "application/json",
-            "Authorization": f"Bearer {self.bearer_token}"
-        }
-        api_url = f"https://api.themoviedb.org/3/{endpoint}"
-
-        self.tv_shows_thread = DataLoaderThread(api_url, params, headers)
-        self.tv_shows_thread.data_loaded.connect(self.on_tv_shows_data_loaded)
-        self.tv_shows_thread.start()
-
-    def on_tv_shows_data_loaded(self, data):
-        self.tv_shows_loading = False
-        self.tv_shows_loading_indicator.hide()
-        if 'error' in data:
-            QMessageBox.critical(self, "Error", f"Failed to load TV Shows:\n{data['error']}")
-        else:
-            self.tv_shows_total_pages = data.get('total_pages', 1)
-            items_to_display = data['results'][:self.results_per_page]
-            for tv_show_summary in items_to_display:
-                tv_show = self.get_tv_show_details(tv_show_summary['id'])
-                if tv_show:
-                    item = QListWidgetItem()
-                    item.setSizeHint(QSize(400, 300))
-                    item.setData(Qt.ItemDataRole.UserRole, tv_show)
-                    widget = TVShowItemWidget(tv_show, add_watch_later_callback=self.add_to_watch_later)
-                    self.tv_shows_list.addItem(item)
-                    self.tv_shows_list.setItemWidget(item, widget)
+        self.tv_shows_feed.restart()
 
     def load_watch_later(self):
+        # Rows come straight from the stored snapshots, titles without a snapshot or with an
+        # old one are refreshed in the background afterwards
         self.clear_list_widget(self.watch_later_list_widget)
-        for movie_id in self.watch_later_list:
-            movie = self.get_movie_details(movie_id)
-            if movie:
-                item = QListWidgetItem()
-                item.setSizeHint(QSize(400, 300))
-                item.setData(Qt.ItemDataRole.UserRole, movie)
-                widget = MovieItemWidget(movie, add_watch_later_callback=self.add_to_watch_later)
-                self.watch_later_list_widget.addItem(item)
-                self.watch_later_list_widget.setItemWidget(item, widget)
+        entries = self.watch_later.entries()
+        for media_type, tmdb_id, snapshot, stale in entries:
+            if snapshot:
+                get_title_index().add(media_type, snapshot)
+        self.watch_later_list_widget.model().set_items([
+            snapshot or {'id': tmdb_id, 'media_type': media_type}
+            for media_type, tmdb_id, snapshot, stale in entries
+        ])
+        for media_type in ('movie', 'tv'):
+            stale_entries = [(position, tmdb_id) for position, (entry_type, tmdb_id, snapshot, stale) in enumerate(entries)
+                             if stale and entry_type == media_type]
+            if stale_entries:
+                positions, tmdb_ids = zip(*stale_entries)
+                self.hydrate_list(self.watch_later_list_widget, media_type, [{'id': tmdb_id} for tmdb_id in tmdb_ids],
+                                  priority=PRIORITY_BACKGROUND, positions=positions, report_errors=False)
+
+    # Detail Hydration Methods
+    def hydrate_list(self, list_widget, media_type, summaries, start=0, priority=PRIORITY_NORMAL,
+                     positions=None, report_errors=True):
+        tmdb_ids = [summary['id'] for summary in summaries]
+        batch_id = self.detail_hydrator.hydrate(media_type, tmdb_ids, start, priority, positions)
+        self.hydration_targets[batch_id] = (list_widget, media_type, report_errors)
+
+    def on_detail_loaded(self, batch_id, position, details):
+        target = self.hydration_targets.get(batch_id)
+        if target is None:
+            return  # List was cleared while the details were in flight
+        list_widget, media_type, report_errors = target
+        # The same dict went to every caller that shared the lookup, this list gets its own
+        details = dict(details)
+        get_title_index().add(media_type, details)
+        if self.watch_later_tab is not None and list_widget is self.watch_later_list_widget:
+            details['media_type'] = media_type
+            self.watch_later.update_snapshot(media_type, details)
+        # Details arrive in completion order, the model keeps rows in list order
+        with tracer.span('update row', 'gui', position=position, tmdb_id=details.get('id')):
+            self.add_row(list_widget, details, position)
+
+    def on_detail_batch_finished(self, batch_id, failed, error):
+        self.prefetch_batches.pop(batch_id, None)
+        target = self.hydration_targets.pop(batch_id, None)
+        if failed and target is not None and target[2]:
+            QMessageBox.critical(self, "Error", f"Failed to load details for {failed} titles:\n{error}")
 
     # Search Methods
-    def search_prev_page(self):
-        if self.search_page > 1:
-            self.search_page -= 1
-            self.search_movies()
-
-    def search_next_page(self):
-        if self.search_page < self.search_total_pages:
-            self.search_page += 1
-            self.search_movies()
-
-    def search_movies(self):
-        if self.search_loading:
-            return  # Prevent multiple loads at the same time
-        query = self.search_input.text()
+    def search_movies(self, typed=False):
+        self.search_timer.stop()
+        query = self.search_input.text().strip()
         if not query:
-            QMessageBox.warning(self, "Warning", "Please enter a search term.")
+            if typed:
+                # Search box was emptied, nothing to search for anymore
+                self.search_feed.stop()
+                self.clear_list_widget(self.search_results)
+            else:
+                QMessageBox.warning(self, "Warning", "Please enter a search term.")
             return
-        self.search_loading = True
-        self.search_loading_indicator.show()
+
+        # Filters are applied locally, search/movie has no genre filter anyway
+        params = {"query": query}
+        if typed and self.search_feed.started and params == self.search_feed.params:
+            return  # Only whitespace changed, the list already shows this search
+        # Detail lookups and image loads still queued for the previous search are dropped here
         self.clear_list_widget(self.search_results)
-        self.search_page_label.setText(f"Page {self.search_page}")
-
-        # Include filters
-        year = self.year_input.text()
-        genre = self.genre_input.text()
-
-        endpoint = "search/movie"
-        params = {
-            "query": query,
-            "page": self.search_page,
-            "year": year if year else None,
-            "with_genres": genre if genre else None
-        }
-        headers = {
-            "accept": "application/json",
-            "Authorization": f"Bearer {self.bearer_token}"
-        }
-        api_url = f"https://api.themoviedb.org/3/{endpoint}"
 
-        self.search_thread = DataLoaderThread(api_url, params, headers)
-        self.search_thread.data_loaded.connect(self.on_search_data_loaded)
-        self.search_thread.start()
+        # Pages of this search TMDB answered recently are served from the local catalog
+        covered = self.catalog.covered(Catalog.make_search_key('movie', params))
+        if covered is not None:
+            tmdb_ids, pages, total_pages = covered
+            results = self.catalog.get_many('movie', tmdb_ids)
+            if pages >= total_pages:
+                # Answered in full, the catalog also finds titles by overview, genre and cast
+                self.search_feed.stop()
+                seen = set(tmdb_ids)
+                results += [details for details in self.catalog.search(query, 'movie')
+                            if details['id'] not in seen]
+            for position, details in enumerate(results):
+                self.add_search_row(details, position)
+            if pages >= total_pages:
+                return
+            # Scrolling past the covered pages goes on with TMDB
+            self.search_result_ids = list(tmdb_ids)
+            self.search_feed.restart(params, start_page=pages + 1, total_pages=total_pages)
+            return
 
-    def on_search_data_loaded(self, data):
-        self.search_loading = False
-        self.search_loading_indicator.hide()
-        if 'error' in data:
-            QMessageBox.critical(self, "Error", f"Failed to search movies:\n{data['error']}")
+        self.search_result_ids = []
+        self.search_feed.restart(params)
+
+    def search_filters(self):
+        year = self.year_input.text().strip()
+        rating = self.min_rating_input.text().strip().replace(',', '.')
+        runtime = self.max_runtime_input.text().strip()
+        _, sort_key, descending = SEARCH_SORTS[self.sort_combo.currentIndex()]
+        return {
+            # Half typed years would hide everything
+            'year': int(year) if len(year) == 4 and year.isdigit() else None,
+            'genre': self.genre_input.text().strip() or None,
+            'min_rating': float(rating) if rating.replace('.', '', 1).isdigit() else None,
+            'max_runtime': int(runtime) if runtime.isdigit() else None,
+            'sort_key': sort_key,
+            'descending': descending,
+        }
+
+    def search_filters_active(self):
+        filters = self.search_filters()
+        return filters['sort_key'] != 'position' or any(
+            filters[name] is not None for name in ('year', 'genre', 'min_rating', 'max_runtime'))
+
+    def add_search_row(self, item, position):
+        self.search_store.put(position, item)
+        if self.search_filters_active():
+            # Not restarted while running, so streaming rows show up every 50 ms
+            if not self.search_filter_timer.isActive():
+                self.search_filter_timer.start()
         else:
-            self.search_total_pages = data.get('total_pages', 1)
-            items_to_display = data['results'][:self.results_per_page]
-            for movie_summary in items_to_display:
-                movie = self.get_movie_details(movie_summary['id'])
-                if movie:
-                    item = QListWidgetItem()
-                    item.setSizeHint(QSize(400, 300))
-                    item.setData(Qt.ItemDataRole.UserRole, movie)
-                    widget = MovieItemWidget(movie, add_watch_later_callback=self.add_to_watch_later)
-                    self.search_results.addItem(item)
-                    self.search_results.setItemWidget(item, widget)
-
-    def get_movie_details(self, movie_id):
-        movie = self.tmdb_api_request(f"movie/{movie_id}", params={"language": "en-US"})
-        if movie:
-            credits = self.tmdb_api_request(f"movie/{movie_id}/credits")
-            if credits:
-                movie['cast'] = credits.get('cast', [])
-            else:
-                movie['cast'] = []
-            external_ids = self.tmdb_api_request(f"movie/{movie_id}/external_ids")
-            if external_ids:
-                movie['imdb_id'] = external_ids.get('imdb_id')
-            else:
-                movie['imdb_id'] = None
-            videos = self.tmdb_api_request(f"movie/{movie_id}/videos", params={"language": "en-US"})
-            if videos:
-                trailer_url = self.get_trailer_url(videos.get('results', []))
-                movie['trailer_url'] = trailer_url
-            else:
-                movie['trailer_url'] = None
-            return movie
+            # Nothing to filter or sort, rows stream in as they do in the other lists
+            self.search_results.model().add_item(item, position)
+
+    def apply_search_filters(self):
+        self.search_filter_timer.stop()
+        positions, items = self.search_store.query(**self.search_filters())
+        self.search_results.model().set_items(items, positions)
+        self.load_more_filtered()
+
+    def load_more_filtered(self):
+        # Filters may leave too few rows to scroll, the next page is pulled in without scrolling
+        feed = self.search_feed
+        if (self.search_filters_active() and feed.started and feed.has_more()
+                and self.search_results.model().rowCount() < TMDB_PAGE_SIZE
+                and feed.next_page <= SEARCH_FILTER_MAX_PAGES):
+            feed.load_more()
+
+    def update_completions(self, text):
+        titles = get_title_index().complete(text, media_type='movie') if text.strip() else []
+        self.search_completer.model().setStringList(titles)
+        if titles:
+            self.search_completer.complete()
         else:
-            return None
+            self.search_completer.popup().hide()
 
-    def get_trailer_url(self, videos):
-        for video in videos:
-            if video['type'] == 'Trailer' and video['site'] == 'YouTube':
-                key = video['key']
-                return f"https://www.youtube.com/embed/{key}"
-        return None
+    def on_completion_chosen(self, title):
+        self.search_input.setText(title)
+        self.search_movies(typed=True)
 
-    def get_tv_show_details(self, tv_id):
-        tv_show = self.tmdb_api_request(f"tv/{tv_id}", params={"language": "en-US"})
-        if tv_show:
-            credits = self.tmdb_api_request(f"tv/{tv_id}/credits")
-            if credits:
-                tv_show['cast'] = credits.get('cast', [])
-            else:
-                tv_show['cast'] = []
-            external_ids = self.tmdb_api_request(f"tv/{tv_id}/external_ids")
-            if external_ids:
-                tv_show['imdb_id'] = external_ids.get('imdb_id')
-            else:
-                tv_show['imdb_id'] = None
-            videos = self.tmdb_api_request(f"tv/{tv_id}/videos", params={"language": "en-US"})
-            if videos:
-                trailer_url = self.get_trailer_url(videos.get('results', []))
-                tv_show['trailer_url'] = trailer_url
-            else:
-                tv_show['trailer_url'] = None
-            return tv_show
-        else:
-            return None
+    def on_search_page_loaded(self, page, results):
+        if page == 1:
+            self.search_result_ids = []
+        self.search_result_ids += [summary['id'] for summary in results]
+        # The pages seen so far can be answered by the catalog from now on
+        key = Catalog.make_search_key('movie', self.search_feed.params)
+        self.catalog.mark_covered(key, 'movie', self.search_result_ids, page, self.search_feed.total_pages)
 
     def handle_item_action(self, item, action):
         movie = item.data(Qt.ItemDataRole.UserRole)
         if action == 'browser':
             self.open_tmdb_page(movie['id'], is_movie=True)
+        elif action == 'details':
+            widget = MovieItemWidget(movie, add_watch_later_callback=self.add_to_watch_later)
+            ItemDetailsDialog(widget, movie.get('title', 'Movie'), self).exec()
+
+    def handle_watch_later_action(self, item, action):
+        if item.data(Qt.ItemDataRole.UserRole).get('media_type') == 'tv':
+            self.handle_tv_show_action(item, action)
+        else:
+            self.handle_item_action(item, action)
 
     def handle_tv_show_action(self, item, action):
         tv_show = item.data(Qt.ItemDataRole.UserRole)
         if action == 'browser':
             self.open_tmdb_page(tv_show['id'], is_movie=False)
+        elif action == 'details':
+            widget = TVShowItemWidget(tv_show, add_watch_later_callback=self.add_to_watch_later)
+            ItemDetailsDialog(widget, tv_show.get('name', 'TV Show'), self).exec()
 
     def open_tmdb_page(self, tmdb_id, is_movie=True):
         if is_movie:
@@ -975,24 +980,40 @@ class TMDBApp(QMainWindow):
             url = f"https://www.themoviedb.org/tv/{tmdb_id}"
         QDesktopServices.openUrl(QUrl(url))
 
-    def add_to_watch_later(self, movie):
-        movie_id = movie.get('id')
-        if movie_id not in self.watch_later_list:
-            self.watch_later_list.append(movie_id)
-            self.save_config()
-            self.load_watch_later()
+    def add_to_watch_later(self, item):
+        media_type = 'movie' if 'title' in item else 'tv'
+        if self.watch_later.add(media_type, item) and self.watch_later_tab is not None:
+            # One new row at the end instead of rebuilding the list
+            model = self.watch_later_list_widget.model()
+            model.add_item(dict(item, media_type=media_type))
+            if 'cast' not in item:
+                # Only a list summary so far, its details replace the row and the snapshot
+                self.hydrate_list(self.watch_later_list_widget, media_type, [item], priority=PRIORITY_BACKGROUND,
+                                  positions=[model.positions[-1]], report_errors=False)
 
     def save_settings(self):
         self.bearer_token = self.bearer_token_input.text().strip()
         self.results_per_page = int(self.results_per_page_input.text().strip())
+        self.max_concurrent_requests = int(self.max_concurrent_requests_input.text().strip())
+        self.detail_hydrator.set_max_workers(self.max_concurrent_requests)
         self.proxy_enabled = self.proxy_enabled_checkbox.isChecked()
         self.proxy_address = self.proxy_address_input.text().strip()
         self.proxy_port = int(self.proxy_port_input.text().strip()) if self.proxy_port_input.text().strip() else 0
+        self.tmdb_client.bearer_token = self.bearer_token
+        configure_session(self.http_pool_size, self.http_retries, proxies=self.get_proxies())
 
         self.save_config()
         QMessageBox.information(self, "Settings", "Settings saved successfully.")
         self.load_favorites()
 
+    def closeEvent(self, event):
+        get_title_index().flush()
+        self.detail_hydrator.shutdown()
+        get_image_loader().shutdown()
+        get_request_scheduler().shutdown()
+        get_image_scheduler().shutdown()
+        super().closeEvent(event)
+
     def apply_stylesheet(self):
         font = QFont("Arial", self.font_size)
         self.setFont(font)
@@ -1122,11 +1143,7 @@ class TVShowItemWidget(MovieItemWidget):
         content_layout = QHBoxLayout()
         # Poster Image
         self.poster_label = QLabel()
-        pixmap = self.get_image(self.tv_show.get('poster_path'))
-        if pixmap:
-            self.poster_label.setPixmap(pixmap.scaled(200, 300, Qt.AspectRatioMode.KeepAspectRatio))
-        else:
-            self.poster_label.setText("No Image")
+        self.load_image(self.poster_label, self.tv_show.get('poster_path'), 'poster', 200, 300)
         content_layout.addWidget(self.poster_label)
 
         # TV Show Information
@@ -1213,7 +1230,12 @@ class TVShowItemWidget(MovieItemWidget):
 
 
 if __name__ == "__main__":
+    startup_report.mark("imports")
+    prepare_application()
     app = QApplication(sys.argv)
+    startup_report.mark("qt init")
     window = TMDBApp()
     window.show()
+    startup_report.watch_first_paint(window)
+    get_stall_watchdog().start()
     sys.exit(app.exec())
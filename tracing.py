@@ -0,0 +1,96 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Set to a file path to record from startup until exit, e.g. TMDB_TRACE=trace.json
+TRACE_ENV = 'TMDB_TRACE'
+# About 100 MB of JSON, recording stops there instead of growing without bound
+MAX_EVENTS = 500_000
+
+
+class Tracer:
+    # Collects Chrome trace events (chrome://tracing, ui.perfetto.dev) while enabled
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.enabled = False
+        self.events = []
+        self.thread_names = {}
+        self.origin = time.perf_counter()
+        self.dropped = 0
+
+    def start(self):
+        with self.lock:
+            self.events = []
+            self.thread_names = {}
+            self.origin = time.perf_counter()
+            self.dropped = 0
+            self.enabled = True
+
+    def stop(self, path):
+        # Writes what was recorded and returns the number of events
+        with self.lock:
+            self.enabled = False
+            events = self.events + [
+                {'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+                for tid, name in self.thread_names.items()
+            ]
+            self.events = []
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms',
+                       'otherData': {'dropped_events': self.dropped}}, f)
+        return len(events)
+
+    def add(self, event):
+        thread = threading.current_thread()
+        event['pid'] = os.getpid()
+        event['tid'] = thread.ident
+        with self.lock:
+            if not self.enabled:
+                return
+            if len(self.events) >= MAX_EVENTS:
+                self.dropped += 1
+                return
+            self.thread_names.setdefault(thread.ident, thread.name)
+            self.events.append(event)
+
+    def complete(self, name, seconds, category='app', **args):
+        # A span that ends now and lasted seconds
+        if not self.enabled:
+            return
+        end = time.perf_counter()
+        self.add({'name': name, 'cat': category, 'ph': 'X', 'ts': (end - seconds - self.origin) * 1e6,
+                  'dur': seconds * 1e6, 'args': args})
+
+    def instant(self, name, category='app', **args):
+        if not self.enabled:
+            return
+        self.add({'name': name, 'cat': category, 'ph': 'i', 's': 't',
+                  'ts': (time.perf_counter() - self.origin) * 1e6, 'args': args})
+
+    @contextmanager
+    def span(self, name, category='app', **args):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.complete(name, time.perf_counter() - started, category, **args)
+
+    def stop_at_exit(self, path):
+        # Recording may have been stopped from the menu already
+        if self.enabled:
+            self.stop(path)
+
+
+tracer = Tracer()
+
+if os.environ.get(TRACE_ENV):
+    tracer.start()
+    atexit.register(tracer.stop_at_exit, os.environ[TRACE_ENV])
@@ -0,0 +1,98 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from catalog import TOP_CAST
+
+
+DEFAULT_STORE_PATH = 'watch_later.sqlite3'
+# Snapshots older than this are refreshed in the background after the list is shown
+SNAPSHOT_TTL = 7 * 24 * 3600
+
+
+class WatchLaterStore:
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS watch_later (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                media_type TEXT NOT NULL,
+                tmdb_id INTEGER NOT NULL,
+                snapshot TEXT,
+                added_at REAL NOT NULL,
+                refreshed_at REAL,
+                UNIQUE (media_type, tmdb_id)
+            )
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def make_snapshot(media_type, details):
+        return json.dumps(dict(details, cast=details.get('cast', [])[:TOP_CAST], media_type=media_type))
+
+    def migrate_json(self, json_path, catalog=None):
+        # One-time import of the old watch_later.json list of movie ids, snapshots are
+        # taken from the catalog where it already has the title
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, 'r') as f:
+                movie_ids = [int(movie_id) for movie_id in json.load(f)]
+        except (ValueError, TypeError):
+            movie_ids = []
+        known = {details['id']: details for details in catalog.get_many('movie', movie_ids)} if catalog else {}
+        now = time.time()
+        rows = []
+        for movie_id in movie_ids:
+            details = known.get(movie_id)
+            snapshot = self.make_snapshot('movie', details) if details else None
+            rows.append(('movie', movie_id, snapshot, now, now if details else None))
+        with self.lock, self.conn:
+            self.conn.executemany("""
+                INSERT OR IGNORE INTO watch_later (media_type, tmdb_id, snapshot, added_at, refreshed_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+        os.replace(json_path, json_path + '.migrated')
+        return len(rows)
+
+    def add(self, media_type, details):
+        # False when the title is already on the list. A list summary without cast is stored
+        # as stale already, so the next load replaces it with full details
+        now = time.time()
+        refreshed_at = now if 'cast' in details else 0
+        with self.lock, self.conn:
+            cursor = self.conn.execute("""
+                INSERT OR IGNORE INTO watch_later (media_type, tmdb_id, snapshot, added_at, refreshed_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (media_type, details['id'], self.make_snapshot(media_type, details), now, refreshed_at))
+        return cursor.rowcount > 0
+
+    def update_snapshot(self, media_type, details):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE watch_later SET snapshot = ?, refreshed_at = ? WHERE media_type = ? AND tmdb_id = ?",
+                (self.make_snapshot(media_type, details), time.time(), media_type, details['id'])
+            )
+
+    def entries(self):
+        # In the order titles were added: (media_type, tmdb_id, snapshot or None, snapshot is stale)
+        cutoff = time.time() - SNAPSHOT_TTL
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT media_type, tmdb_id, snapshot, refreshed_at FROM watch_later ORDER BY id"
+            ).fetchall()
+        return [
+            (media_type, tmdb_id, json.loads(snapshot) if snapshot else None,
+             snapshot is None or refreshed_at < cutoff)
+            for media_type, tmdb_id, snapshot, refreshed_at in rows
+        ]
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM watch_later").fetchone()[0]
@@ -0,0 +1,21 @@
+from PyQt6.QtCore import Qt, QCoreApplication
+
+
+def prepare_application():
+    # QtWebEngine is imported the first time a page is shown, Qt only allows that
+    # late import when OpenGL contexts are shared before the QApplication exists
+    QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+
+
+def create_web_view(allow_insecure_content=False):
+    # First call loads QtWebEngine and starts its Chromium process
+    from PyQt6.QtWebEngineWidgets import QWebEngineView
+    web_view = QWebEngineView()
+    if allow_insecure_content:
+        from PyQt6.QtWebEngineCore import QWebEngineSettings
+        # Attempt to adjust settings to fix CORS issues (may not work)
+        settings = web_view.settings()
+        settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True)
+        settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessFileUrls, True)
+        settings.setAttribute(QWebEngineSettings.WebAttribute.AllowRunningInsecureContent, True)
+    return web_view